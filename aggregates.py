@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Table Summaries Computed Where the Data Lives
+=============================================
+The viewer's summary and the live-analysis insights only need aggregates:
+row counts, first/last submission, submissions per hour and per day, and
+length statistics of the encrypted column. Pulling every row and ciphertext
+to compute those is wasteful, so each data source answers them itself:
+
+- Supabase: the `table_summary` Postgres function below, called through RPC
+  (install it once with the SQL editor)
+- replica.LocalReplica: one SQL query over the SQLite file
+- fake_supabase.FakeSupabase: `summarize_columns` over its in-memory arrays
+
+All of them return the same dict, a few kilobytes whatever the table size:
+
+    {'rows': 1200, 'first': '2025-09-01T...', 'last': '2025-09-07T...',
+     'hourly': {9: 130, 10: 171, ...}, 'daily': {'2025-09-01': 210, ...},
+     'length': {'mean': 108.4, 'min': 88, 'max': 152}}
+
+`length` is None when no length column is requested. Hours and days are UTC.
+If the RPC is not installed, `summarize_pages` computes the same result from
+the (created_at, length column) pages of the table, one page at a time.
+"""
+
+from collections import Counter
+
+# Column whose length is summarized for each table
+LENGTH_COLUMNS = {'fable': 'hash_data', 'ocr': 'recog_text'}
+
+TABLE_SUMMARY_SQL = """
+create or replace function table_summary(table_name text, length_column text default null)
+returns json language plpgsql stable as $$
+declare
+  result json;
+begin
+  if table_name not in ('fable', 'ocr') then
+    raise exception 'table_summary: unknown table %', table_name;
+  end if;
+  execute format($query$
+    with t as (
+      select created_at, created_at at time zone 'UTC' as ts, %s as len from %I
+    )
+    select json_build_object(
+      'rows', (select count(*) from t),
+      'first', (select min(created_at) from t),
+      'last', (select max(created_at) from t),
+      'hourly', (select coalesce(json_object_agg(h, n), '{}') from
+                 (select extract(hour from ts)::int as h, count(*) as n from t group by 1) s),
+      'daily', (select coalesce(json_object_agg(d, n), '{}') from
+                (select to_char(ts, 'YYYY-MM-DD') as d, count(*) as n from t group by 1) s),
+      'length', case when %L is null then null else
+                (select json_build_object('mean', avg(len), 'min', min(len), 'max', max(len)) from t) end
+    )
+  $query$, coalesce(format('length(%I)', length_column), 'null::int'), table_name, length_column)
+  into result;
+  return result;
+end
+$$;
+"""
+
+def _length_stats(count, total, lowest, highest):
+    if not count:
+        return {'mean': None, 'min': None, 'max': None}
+    return {'mean': total / count, 'min': int(lowest), 'max': int(highest)}
+
+def normalize_summary(summary):
+    """Bring a summary decoded from JSON back to int hours and float means"""
+    summary = dict(summary)
+    summary['rows'] = int(summary['rows'])
+    summary['hourly'] = {int(h): int(n) for h, n in sorted((summary.get('hourly') or {}).items(), key=lambda kv: int(kv[0]))}
+    summary['daily'] = {d: int(n) for d, n in sorted((summary.get('daily') or {}).items())}
+    length = summary.get('length')
+    if length is not None:
+        summary['length'] = {
+            'mean': None if length['mean'] is None else float(length['mean']),
+            'min': None if length['min'] is None else int(length['min']),
+            'max': None if length['max'] is None else int(length['max']),
+        }
+    return summary
+
+def summarize_columns(created_at, lengths=None):
+    """
+    Summary of one table from its created_at strings and optional lengths
+
+    Timestamps are ISO-8601 UTC strings as Supabase returns them.
+    """
+    import numpy as np
+    import pandas as pd
+
+    created_at = pd.Series(np.asarray(created_at, dtype=object), dtype=object).astype(str)
+    hourly = created_at.str[11:13].astype(int).value_counts().sort_index() if len(created_at) else pd.Series(dtype=int)
+    daily = created_at.str[:10].value_counts().sort_index()
+
+    summary = {
+        'rows': len(created_at),
+        'first': created_at.min() if len(created_at) else None,
+        'last': created_at.max() if len(created_at) else None,
+        'hourly': {int(h): int(n) for h, n in hourly.items()},
+        'daily': {d: int(n) for d, n in daily.items()},
+        'length': None,
+    }
+    if lengths is not None:
+        lengths = np.asarray(lengths, dtype=np.int64)
+        summary['length'] = _length_stats(len(lengths), int(lengths.sum()),
+                                          lengths.min() if len(lengths) else None,
+                                          lengths.max() if len(lengths) else None)
+    return summary
+
+def summarize_pages(pages, length_column=None):
+    """Same summary built page by page from streamed row dicts"""
+    rows = 0
+    first = last = None
+    hourly = Counter()
+    daily = Counter()
+    count = total = 0
+    lowest = highest = None
+
+    for page in pages:
+        rows += len(page)
+        for row in page:
+            timestamp = row['created_at']
+            first = timestamp if first is None else min(first, timestamp)
+            last = timestamp if last is None else max(last, timestamp)
+            hourly[int(timestamp[11:13])] += 1
+            daily[timestamp[:10]] += 1
+            if length_column and row.get(length_column) is not None:
+                length = len(row[length_column])
+                count += 1
+                total += length
+                lowest = length if lowest is None else min(lowest, length)
+                highest = length if highest is None else max(highest, length)
+
+    return {
+        'rows': rows,
+        'first': first,
+        'last': last,
+        'hourly': dict(sorted(hourly.items())),
+        'daily': dict(sorted(daily.items())),
+        'length': _length_stats(count, total, lowest, highest) if length_column else None,
+    }
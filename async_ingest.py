@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Concurrent Table Ingestion over One Pooled HTTP Session
+=======================================================
+Fetches the `fable` and `ocr` tables at the same time, and several id ranges
+of each table at the same time, instead of one page after another.
+
+- One `httpx.AsyncClient` (keep-alive connection pool) serves every request.
+- Each table is split into `streams` id ranges; every range is read with the
+  same (created_at, id) keyset pages as table_reader, so ranges are
+  independent and each stays cheap for PostgREST.
+- A semaphore caps requests in flight at `max_concurrency`.
+- Timeouts, connection errors, 429 and 5xx responses are retried with
+  exponential backoff and jitter, honouring Retry-After.
+- Pages go through a bounded queue: when the consumer falls behind, the
+  fetchers wait instead of piling pages up in memory (back-pressure).
+
+Pages of different ranges interleave, so consumers that need (created_at, id)
+order sort afterwards, as `fetch_tables` does.
+
+    async for table, rows in ingest_pages(['fable', 'ocr']):
+        ...
+    survey_data, ocr_data = fetch_tables(['fable', 'ocr']).values()
+"""
+
+import asyncio
+import random
+
+import httpx
+import pandas as pd
+
+from config import SUPABASE_KEY, SUPABASE_URL
+from table_reader import DEFAULT_BATCH_SIZE, TABLE_COLUMNS, _keyset_filter
+
+DEFAULT_STREAMS = 4
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_QUEUE_PAGES = 16
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+class RestClient:
+    """Minimal async PostgREST reader with retries and a request cap"""
+
+    def __init__(self, url=SUPABASE_URL, key=SUPABASE_KEY, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 transport=None, timeout=30.0):
+        self.session = httpx.AsyncClient(
+            base_url=f"{url.rstrip('/')}/rest/v1",
+            headers={'apikey': key, 'Authorization': f'Bearer {key}'},
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=timeout,
+            transport=transport,
+        )
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.requests = 0
+        self.retries = 0
+
+    async def get(self, table, params):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self.slots:
+                    self.requests += 1
+                    response = await self.session.get(f'/{table}', params=params)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = response.headers.get('Retry-After')
+                error = httpx.HTTPStatusError(f"{response.status_code} from {table}",
+                                              request=response.request, response=response)
+            except httpx.TransportError as e:
+                retry_after, error = None, e
+
+            if attempt == MAX_RETRIES:
+                raise error
+            self.retries += 1
+            delay = BACKOFF_BASE * 2 ** attempt * random.uniform(0.5, 1.5)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        await self.session.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+async def _id_bounds(client, table, after):
+    params = {'select': 'id', 'limit': 1}
+    if after is not None:
+        params['or'] = f'({_keyset_filter(*after)})'
+    first = await client.get(table, {**params, 'order': 'id.asc'})
+    last = await client.get(table, {**params, 'order': 'id.desc'})
+    if not first:
+        return None
+    return first[0]['id'], last[0]['id']
+
+async def _read_range(client, table, columns, lower, upper, after, batch_size, queue):
+    """Keyset-page one id range [lower, upper) of `table` into the queue"""
+    last_key = after
+    while True:
+        params = [('select', ','.join(columns)), ('order', 'created_at.asc,id.asc'),
+                  ('limit', str(batch_size)), ('id', f'gte.{lower}'), ('id', f'lt.{upper}')]
+        if last_key is not None:
+            params.append(('or', f'({_keyset_filter(*last_key)})'))
+        rows = await client.get(table, params)
+        # A short page may only be capped by max-rows; the empty page ends the range
+        if not rows:
+            return
+        # Waits here while the consumer is behind
+        await queue.put((table, rows))
+        last_key = (rows[-1]['created_at'], rows[-1]['id'])
+
+async def _produce(client, tables, streams, batch_size, after, queue):
+    async def read_table(table):
+        columns = TABLE_COLUMNS.get(table, ['*'])
+        bounds = await _id_bounds(client, table, after.get(table))
+        if bounds is None:
+            return
+        lowest, highest = bounds
+        step = max(1, -(-(highest + 1 - lowest) // streams))
+        await asyncio.gather(*[
+            _read_range(client, table, columns, start, min(start + step, highest + 1), after.get(table),
+                        batch_size, queue)
+            for start in range(lowest, highest + 1, step)
+        ])
+
+    await asyncio.gather(*[read_table(table) for table in tables])
+
+async def ingest_pages(tables=tuple(TABLE_COLUMNS), streams=DEFAULT_STREAMS, batch_size=DEFAULT_BATCH_SIZE,
+                       after=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, queue_pages=DEFAULT_QUEUE_PAGES,
+                       url=SUPABASE_URL, key=SUPABASE_KEY, transport=None):
+    """
+    Async generator of (table, rows) pages fetched concurrently
+
+    `after` optionally maps a table to a (created_at, id) key; only rows after
+    it are read. At most `queue_pages` pages wait for the consumer.
+    """
+    queue = asyncio.Queue(maxsize=queue_pages)
+    done = object()
+
+    async with RestClient(url, key, max_concurrency, transport) as client:
+        async def run():
+            try:
+                await _produce(client, list(tables), streams, batch_size, after or {}, queue)
+            finally:
+                await queue.put(done)
+
+        producer = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            # Surface a failed fetch instead of returning partial data
+            await producer
+        finally:
+            producer.cancel()
+
+def fetch_tables(tables=tuple(TABLE_COLUMNS), **kwargs):
+    """Read whole tables concurrently into DataFrames ordered by (created_at, id)"""
+    async def collect():
+        pages = {table: [] for table in tables}
+        async for table, rows in ingest_pages(tables, **kwargs):
+            pages[table].extend(rows)
+        return pages
+
+    frames = {}
+    for table, rows in asyncio.run(collect()).items():
+        columns = TABLE_COLUMNS.get(table)
+        frame = pd.DataFrame.from_records(rows, columns=columns)
+        frames[table] = frame.sort_values(['created_at', 'id'], ignore_index=True, kind='stable')
+    return frames
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Suite
+========================
+Times and memory-profiles every stage of differential_privacy_pipeline.py and
+live_data_analysis.py on synthetic data, fully offline.
+
+For each scale it generates encrypted `fable`/`ocr` rows and churn rows
+(synthetic_data.py), serves them through FakeSupabase, and runs fetch,
+replica sync, decrypt, noise, feature binning, DP statistics, clustering,
+plotting and writes one stage at a time. Results are appended as JSON lines, one record per
+stage, so runs on different commits can be compared:
+
+    python benchmark.py --scales 10k 1m
+    python benchmark.py --scales 10k --compare benchmark_results.jsonl
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+# Plots are written to files; never open a window
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+import pandas as pd
+
+import differential_privacy_pipeline as dp_pipeline
+import live_data_analysis as live
+from async_ingest import fetch_tables
+from decryption import decrypt_survey_column
+from dp_noise import LaplaceNoise
+from fake_supabase import FakeSupabase
+from replica import LocalReplica
+from rolling_aggregates import RollingAggregates
+from storage import write_frame
+from synthetic_data import generate_churn_frame, generate_ocr_frame, generate_survey_frame, parse_scale
+from table_reader import SupabaseSource, read_table
+
+DEFAULT_OUTPUT = 'benchmark_results.jsonl'
+
+# Regressions are flagged when a stage gets this much slower
+REGRESSION_THRESHOLD = 1.2
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class Benchmark:
+    """Runs stages one at a time and collects one record per stage"""
+
+    def __init__(self, scale, memory=True, run_id=None, verbose=False):
+        self.scale = scale
+        self.memory = memory
+        self.verbose = verbose
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+        self.context = {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'cpus': os.cpu_count(),
+        }
+
+    def stage(self, name, rows, func, *args, **kwargs):
+        gc.collect()
+        output = sys.stdout if self.verbose else io.StringIO()
+        if self.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.memory else None
+            if self.memory:
+                tracemalloc.stop()
+
+        record = {
+            'run_id': self.run_id,
+            'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+            'stage': name,
+            'scale': self.scale,
+            'rows': int(rows),
+            'seconds': round(seconds, 6),
+            'rows_per_second': round(rows / seconds, 1) if seconds > 0 else None,
+            'peak_mb': round(peak / 2**20, 3) if peak is not None else None,
+            **self.context,
+        }
+        self.records.append(record)
+        peak_text = f", peak {record['peak_mb']:.1f} MB" if peak is not None else ""
+        print(f"   {name:<45} {seconds:9.3f}s  {record['rows_per_second'] or 0:>14,.0f} rows/s{peak_text}",
+              file=sys.stderr)
+        return result
+
+def run_scale(n, memory=True, run_id=None, verbose=False, latency=0.0):
+    """Run every stage once at `n` survey rows; returns the stage records"""
+    bench = Benchmark(n, memory, run_id, verbose)
+    print(f"\n📏 Scale {n:,} rows", file=sys.stderr)
+
+    n_ocr = max(n // 10, 1)
+    surveys = bench.stage('generate.survey', n, generate_survey_frame, n)
+    ocr = bench.stage('generate.ocr', n_ocr, generate_ocr_frame, n_ocr)
+    churn = bench.stage('generate.churn', n, generate_churn_frame, n)
+    client = FakeSupabase({'fable': surveys, 'ocr': ocr}, latency=latency)
+    del surveys
+
+    workdir = tempfile.mkdtemp(prefix='obscura-bench-')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        # Fetch
+        fetched = bench.stage('fetch.read_table(fable)', n, read_table, client, 'fable')
+        survey_data, ocr_data = bench.stage('live.fetch_data', n + n_ocr, live.fetch_data, client)
+        bench.stage('ingest.fetch_tables(async)', n + n_ocr, fetch_tables, ['fable', 'ocr'],
+                    url='http://fake', key='', transport=client.rest_transport())
+        replica = LocalReplica(os.path.join(workdir, 'replica.sqlite'))
+        bench.stage('replica.sync', n + n_ocr, replica.sync, client)
+        bench.stage('replica.read(fable)', n, replica.read, 'fable')
+
+        # Decrypt and noise
+        answers = bench.stage('decrypt.decrypt_survey_column', n, decrypt_survey_column, fetched['hash_data'])
+        answers['survey_id'] = fetched['id']
+        answers['timestamp'] = fetched['created_at']
+        released = answers.drop(columns=dp_pipeline.RAW_ANSWER_COLUMNS)
+        dp_df = bench.stage('dp.apply_differential_privacy', n, dp_pipeline.apply_differential_privacy, released)
+        bench.stage('dp.apply_differential_privacy(seeded, threads)', n, dp_pipeline.apply_differential_privacy,
+                    released, seed=0, workers=os.cpu_count() or 1)
+        bench.stage('dp.demonstrate_privacy_protection', n, dp_pipeline.demonstrate_privacy_protection, answers, dp_df)
+        bench.stage('dp.report_private_statistics', n, dp_pipeline.report_private_statistics, answers, ledger_file=None)
+
+        # Features and writes
+        analysis_df = bench.stage('dp.add_analysis_features', n, dp_pipeline.add_analysis_features, dp_df)
+        bench.stage('dp.create_analysis_ready_dataset', n, dp_pipeline.create_analysis_ready_dataset, dp_df)
+        bench.stage('write.parquet', n, write_frame, analysis_df, os.path.join(workdir, 'analysis.parquet'))
+        bench.stage('write.csv', n, analysis_df.to_csv, os.path.join(workdir, 'analysis.csv'), index=False)
+
+        # End-to-end DP runs
+        bench.stage('dp.create_privacy_preserving_dataset', n, dp_pipeline.create_privacy_preserving_dataset, client)
+        bench.stage('dp.run_incremental', n, dp_pipeline.run_incremental, replica,
+                    state_file=os.path.join(workdir, 'state.json'), output_dir=os.path.join(workdir, 'dataset'))
+
+        # Live analysis
+        # Includes waiting for the background dashboard render
+        bench.stage('live.analyze_survey_data', n, lambda df: live.analyze_survey_data(df).result(), survey_data.copy())
+        bench.stage('live.analyze_ocr_data', n_ocr, live.analyze_ocr_data, ocr_data.copy())
+        summaries = {}
+        for name, source in [('fake', SupabaseSource(client)), ('replica', replica)]:
+            summaries[name] = (bench.stage(f'summarize.{name}(fable)', n, source.summarize, 'fable'),
+                               bench.stage(f'summarize.{name}(ocr)', n_ocr, source.summarize, 'ocr'))
+        bench.stage('live.generate_insights', n + n_ocr, live.generate_insights, *summaries['replica'])
+        aggregates = RollingAggregates()
+        bench.stage('live.rolling_aggregates.poll', n + n_ocr, aggregates.poll, replica)
+        bench.stage('live.rolling_aggregates.poll(no new rows)', n + n_ocr, aggregates.poll, replica)
+        bench.stage('live.run_ml_analysis', n, live.run_ml_analysis, survey_data.copy())
+
+        # Churn noising (DiffPriv.ipynb / anonymize.py)
+        churn['TotalCharges'] = pd.to_numeric(churn['TotalCharges'], errors='coerce')
+        mechanism = LaplaceNoise.from_frame(churn, ['tenure', 'MonthlyCharges', 'TotalCharges'], epsilon=1.0)
+        bench.stage('churn.laplace_noise', n, mechanism.apply, churn, inplace=True)
+        replica.close()
+    finally:
+        os.chdir(cwd)
+        # Replica, outputs, dedup index and state files can reach gigabytes at 10M rows
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return bench.records
+
+def load_latest_run(path):
+    """Records of the most recent run in a JSON-lines results file"""
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        return []
+    latest = records[-1]['run_id']
+    return [r for r in records if r['run_id'] == latest]
+
+def compare(records, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print per-stage speed ratios against a baseline run; returns regressions"""
+    base = {(r['stage'], r['scale']): r for r in baseline}
+    regressions = []
+    print(f"\n📊 Compared with run {baseline[0]['run_id']} ({baseline[0].get('commit')})", file=sys.stderr)
+    for record in records:
+        old = base.get((record['stage'], record['scale']))
+        if not old or not old['seconds']:
+            continue
+        ratio = record['seconds'] / old['seconds']
+        flag = "  ⚠️ REGRESSION" if ratio > threshold else ""
+        print(f"   {record['stage']:<45} {record['scale']:>10,}  x{ratio:5.2f}{flag}", file=sys.stderr)
+        if flag:
+            regressions.append(record['stage'])
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic data")
+    parser.add_argument('--scales', nargs='+', default=['10k'], help="row counts, e.g. 10k 1m 10m")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"JSON-lines results file (default {DEFAULT_OUTPUT})")
+    parser.add_argument('--compare', help="results file whose latest run is the baseline")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc (faster, no peak_mb)")
+    parser.add_argument('--verbose', action='store_true', help="show the pipeline's own output")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="simulated seconds per request to the fake Supabase (default 0)")
+    args = parser.parse_args(argv)
+
+    baseline = load_latest_run(args.compare) if args.compare else None
+
+    print("🚀 OBSCURA PIPELINE BENCHMARK", file=sys.stderr)
+    run_id = uuid.uuid4().hex[:12]
+    records = []
+    for scale in args.scales:
+        records += run_scale(parse_scale(scale), memory=not args.no_memory, run_id=run_id, verbose=args.verbose,
+                             latency=args.latency)
+
+    with open(args.output, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    print(f"\n💾 Appended {len(records)} results (run {run_id}) to {args.output}", file=sys.stderr)
+
+    if baseline:
+        regressions = compare(records, baseline)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Churn Feature Pipeline
+======================
+The preprocessing of Prediction.ipynb as one fitted, saveable transformer, so
+training and scoring share the same code path:
+
+- Yes/No columns (with "No internet service" / "No phone service" as No) and
+  gender become 0/1
+- InternetService, Contract and PaymentMethod are one-hot encoded with the
+  categories seen in training
+- tenure, MonthlyCharges and TotalCharges are min-max scaled with the training
+  range
+
+Every categorical column is encoded by looking its category codes up in a
+precomputed array, one vectorized pass per column instead of pandas `replace`
+loops. The output always has the same 26 columns in the same order, whatever
+the categories present in the rows being transformed; unseen categories become
+NaN (binary) or all-zero (one-hot). Blank TotalCharges, which the notebook
+dropped, are customers with no charges yet and become 0.
+
+    preprocessor = ChurnPreprocessor().fit(train_df)
+    X, y = preprocessor.transform(train_df), preprocessor.target(train_df)
+    for X in preprocessor.transform_chunks(pd.read_csv(path, chunksize=100_000)):
+        ...
+"""
+
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+YES_NO_COLUMNS = ['Partner', 'Dependents', 'PhoneService', 'MultipleLines', 'OnlineSecurity', 'OnlineBackup',
+                  'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies', 'PaperlessBilling']
+ONE_HOT_COLUMNS = ['InternetService', 'Contract', 'PaymentMethod']
+SCALED_COLUMNS = ['tenure', 'MonthlyCharges', 'TotalCharges']
+TARGET = 'Churn'
+
+# Category -> value lookups for the binary columns
+YES_NO = {'Yes': 1.0, 'No': 0.0, 'No internet service': 0.0, 'No phone service': 0.0}
+GENDER = {'Female': 1.0, 'Male': 0.0}
+
+# Column order of the notebook's get_dummies output, without Churn
+PASSTHROUGH_ORDER = ['gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService', 'MultipleLines',
+                     'OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV',
+                     'StreamingMovies', 'PaperlessBilling', 'MonthlyCharges', 'TotalCharges']
+
+def _lookup(values, mapping):
+    """Map strings through `mapping` with one category-code lookup; unknown values become NaN"""
+    categories = list(mapping)
+    # Code -1 (unknown) indexes the trailing NaN
+    table = np.append(np.array([mapping[c] for c in categories], dtype=np.float64), np.nan)
+    codes = pd.Categorical(values, categories=categories).codes
+    return table[codes]
+
+def _numeric(values):
+    """Numbers from a column that may hold blank strings (TotalCharges)"""
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values.astype(str).str.strip().replace('', '0'), errors='coerce')
+    return values.to_numpy(dtype=np.float64)
+
+class ChurnPreprocessor:
+    """Fitted customer_churn.csv -> 26 model features transformer"""
+
+    def __init__(self, dtype=np.float32):
+        self.dtype = dtype
+        self.categories = {}
+        self.minimum = None
+        self.scale = None
+        self.feature_names = None
+
+    @property
+    def fitted(self):
+        return self.feature_names is not None
+
+    def fit(self, frame):
+        """Learn the one-hot categories and the scaling range from training rows"""
+        self.categories = {col: sorted(frame[col].dropna().astype(str).unique()) for col in ONE_HOT_COLUMNS}
+        scaled = np.column_stack([_numeric(frame[col]) for col in SCALED_COLUMNS])
+        self.minimum = np.nanmin(scaled, axis=0)
+        span = np.nanmax(scaled, axis=0) - self.minimum
+        self.scale = np.where(span > 0, span, 1.0)
+        self.feature_names = PASSTHROUGH_ORDER + [f'{col}_{category}' for col in ONE_HOT_COLUMNS
+                                                  for category in self.categories[col]]
+        return self
+
+    def transform_array(self, frame):
+        """Feature matrix (rows x 26) in `feature_names` order"""
+        if not self.fitted:
+            raise RuntimeError("fit() the preprocessor before transforming")
+        n = len(frame)
+        features = np.zeros((n, len(self.feature_names)), dtype=self.dtype)
+
+        columns = {'gender': _lookup(frame['gender'], GENDER),
+                   'SeniorCitizen': frame['SeniorCitizen'].to_numpy(dtype=np.float64)}
+        for col in YES_NO_COLUMNS:
+            columns[col] = _lookup(frame[col], YES_NO)
+        for j, col in enumerate(SCALED_COLUMNS):
+            columns[col] = (_numeric(frame[col]) - self.minimum[j]) / self.scale[j]
+        for j, col in enumerate(PASSTHROUGH_ORDER):
+            features[:, j] = columns[col]
+
+        offset = len(PASSTHROUGH_ORDER)
+        rows = np.arange(n)
+        for col in ONE_HOT_COLUMNS:
+            categories = self.categories[col]
+            codes = pd.Categorical(frame[col], categories=categories).codes
+            known = codes >= 0
+            features[rows[known], offset + codes[known]] = 1
+            offset += len(categories)
+        return features
+
+    def transform(self, frame):
+        """Features as a DataFrame with the stable column schema"""
+        return pd.DataFrame(self.transform_array(frame), columns=self.feature_names, index=frame.index)
+
+    def fit_transform(self, frame):
+        return self.fit(frame).transform(frame)
+
+    def transform_chunks(self, chunks):
+        """Transform an iterable of DataFrames (e.g. read_csv(chunksize=...)) lazily"""
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    @staticmethod
+    def target(frame):
+        """Churn as 0/1"""
+        return _lookup(frame[TARGET], YES_NO).astype(np.int8)
+
+    def save(self, path):
+        tmp_file = path + '.tmp'
+        joblib.dump(self, tmp_file)
+        os.replace(tmp_file, path)
+
+    @classmethod
+    def load(cls, path):
+        return joblib.load(path)
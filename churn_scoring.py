@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Churn Scoring Service
+=====================
+Scores customers with the model trained in Prediction.ipynb, outside the
+notebook, on CPU:
+
+- `ChurnScorer` loads the model and the fitted ChurnPreprocessor once and
+  scores DataFrames in fixed-size batches; probabilities are thresholded in one
+  vectorized comparison.
+- `score_file` streams a customer CSV through the scorer chunk by chunk into a
+  .csv or Parquet file, for nightly runs over millions of rows.
+- `MicroBatcher` answers single interactive requests: requests arriving
+  within `max_wait` seconds of each other are scored together as one batch,
+  so a burst of lookups costs one model call instead of one each.
+- `ScoringMetrics` records rows, batches, throughput and request latency
+  percentiles for both modes.
+
+    scorer = ChurnScorer.load('churn_model.keras', 'churn_preprocessor.joblib')
+    score_file(scorer, 'customers.csv', 'scores.parquet')
+    with MicroBatcher(scorer) as batcher:
+        batcher.submit(customer_row).result()
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from churn_features import ChurnPreprocessor
+from storage import write_chunks
+
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_BATCH_SIZE = 8192
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT = 0.005
+ID_COLUMN = 'customerID'
+
+class ScoringMetrics:
+    """Thread-safe counters plus a window of recent request latencies"""
+
+    def __init__(self, window=10_000):
+        self.lock = threading.Lock()
+        self.rows = 0
+        self.batches = 0
+        self.busy = 0.0
+        self.started = time.perf_counter()
+        self.latencies = deque(maxlen=window)
+
+    def record_batch(self, rows, seconds):
+        with self.lock:
+            self.rows += rows
+            self.batches += 1
+            self.busy += seconds
+
+    def record_latency(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def summary(self):
+        with self.lock:
+            elapsed = time.perf_counter() - self.started
+            latencies = np.array(self.latencies)
+            summary = {
+                'rows': self.rows,
+                'batches': self.batches,
+                'rows_per_second': self.rows / elapsed if elapsed else 0.0,
+                'model_rows_per_second': self.rows / self.busy if self.busy else 0.0,
+                'mean_batch_rows': self.rows / self.batches if self.batches else 0.0,
+            }
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            summary.update(latency_ms_p50=p50, latency_ms_p95=p95, latency_ms_p99=p99)
+        return summary
+
+class ChurnScorer:
+    """A loaded churn model and its preprocessor"""
+
+    def __init__(self, model, preprocessor, threshold=DEFAULT_THRESHOLD, batch_size=DEFAULT_BATCH_SIZE):
+        self.model = model
+        self.preprocessor = preprocessor
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.metrics = ScoringMetrics()
+
+    @classmethod
+    def load(cls, model_file, preprocessor_file, **kwargs):
+        """Load a saved Keras model (or a joblib'd scikit-learn classifier)"""
+        if model_file.endswith(('.keras', '.h5')):
+            from tensorflow import keras
+            model = keras.models.load_model(model_file, compile=False)
+        else:
+            import joblib
+            model = joblib.load(model_file)
+        return cls(model, ChurnPreprocessor.load(preprocessor_file), **kwargs)
+
+    def _predict(self, features):
+        if hasattr(self.model, 'predict_proba'):
+            return self.model.predict_proba(features)[:, 1]
+        # Calling the Keras model directly skips predict()'s per-call dataset setup
+        return np.asarray(self.model(features, training=False)).reshape(-1)
+
+    def predict_proba(self, frame):
+        """Churn probability of every row of `frame`"""
+        start = time.perf_counter()
+        features = self.preprocessor.transform_array(frame)
+        probability = np.empty(len(features), dtype=np.float32)
+        for begin in range(0, len(features), self.batch_size):
+            end = begin + self.batch_size
+            probability[begin:end] = self._predict(features[begin:end])
+        self.metrics.record_batch(len(frame), time.perf_counter() - start)
+        return probability
+
+    def score(self, frame):
+        """DataFrame of churn_probability and churn (0/1), aligned with `frame`"""
+        probability = self.predict_proba(frame)
+        scores = pd.DataFrame({'churn_probability': probability,
+                               'churn': (probability > self.threshold).astype(np.int8)}, index=frame.index)
+        if ID_COLUMN in frame:
+            scores.insert(0, ID_COLUMN, frame[ID_COLUMN])
+        return scores
+
+def score_file(scorer, input_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score a customer CSV chunk by chunk into a .csv or Parquet file; returns the metrics"""
+    chunks = pd.read_csv(input_file, chunksize=chunk_size, dtype={'TotalCharges': str})
+    write_chunks((scorer.score(chunk) for chunk in chunks), output_file)
+    return scorer.metrics.summary()
+
+class MicroBatcher:
+    """Coalesces single scoring requests into small batches on a worker thread"""
+
+    def __init__(self, scorer, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._run, name='churn-micro-batcher', daemon=True)
+        self.worker.start()
+
+    def submit(self, customer):
+        """Score one customer (a dict of CSV fields); returns a Future of its score dict"""
+        future = Future()
+        self.requests.put((customer, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        """Block for one request, then take whatever else arrives within max_wait"""
+        first = self.requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                scores = self.scorer.score(pd.DataFrame([customer for customer, _, _ in batch]))
+                results = scores.to_dict('records')
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            for (_, future, submitted), result in zip(batch, results):
+                self.scorer.metrics.record_latency(done - submitted)
+                future.set_result(result)
+
+    def close(self):
+        self.requests.put(None)
+        self.worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
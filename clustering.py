@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Incremental Clustering of Survey Submission Patterns
+====================================================
+Replaces refitting StandardScaler + KMeans over the whole table on every run.
+
+The scaler and a MiniBatchKMeans model are updated with `partial_fit` on rows
+newer than the model's (created_at, id) watermark only, then saved with the
+watermark, so each run's fitting cost depends on new data, not on history.
+When the scaler's statistics move, the centroids are carried over into the
+new scaled space so earlier learning is kept. Cluster assignment and the
+per-cluster summary are single vectorized passes.
+"""
+
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+FEATURES = ['hour', 'day_of_week', 'data_length']
+N_CLUSTERS = 3
+
+def add_cluster_features(survey_data):
+    """Add the metadata features used for clustering to `survey_data`"""
+    created_at = pd.to_datetime(survey_data['created_at'], utc=True, format='ISO8601')
+    survey_data['hour'] = created_at.dt.hour
+    survey_data['day_of_week'] = created_at.dt.dayofweek
+    survey_data['data_length'] = survey_data['hash_data'].str.len()
+    return survey_data
+
+class IncrementalClusterer:
+    """Scaler + MiniBatchKMeans that learn from new batches and persist between runs"""
+
+    def __init__(self, n_clusters=N_CLUSTERS, random_state=42):
+        self.scaler = StandardScaler()
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+        self.watermark = None
+        self.rows_seen = 0
+
+    @property
+    def fitted(self):
+        return hasattr(self.kmeans, 'cluster_centers_')
+
+    def new_rows(self, survey_data):
+        """Mask of rows after the watermark"""
+        if self.watermark is None:
+            return np.ones(len(survey_data), dtype=bool)
+        created_at = pd.to_datetime(survey_data['created_at'], utc=True, format='ISO8601')
+        last_time, last_id = pd.Timestamp(self.watermark[0]), self.watermark[1]
+        if last_time.tzinfo is None:
+            last_time = last_time.tz_localize('UTC')
+        return ((created_at > last_time) | ((created_at == last_time) & (survey_data['id'] > last_id))).to_numpy()
+
+    def partial_fit(self, features):
+        """Update scaler and centroids with one batch of raw feature rows"""
+        features = np.asarray(features, dtype=np.float64)
+        if self.fitted:
+            # Keep centroids in place when the scaler's mean/variance move
+            centers = self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+            self.scaler.partial_fit(features)
+            self.kmeans.cluster_centers_ = self.scaler.transform(centers)
+        else:
+            self.scaler.partial_fit(features)
+        self.kmeans.partial_fit(self.scaler.transform(features))
+        self.rows_seen += len(features)
+
+    def update(self, survey_data):
+        """
+        Learn from rows newer than the watermark; returns how many were used
+
+        The first fit needs at least `n_clusters` rows.
+        """
+        new = survey_data[self.new_rows(survey_data)]
+        if not len(new) or (not self.fitted and len(new) < self.kmeans.n_clusters):
+            return 0
+        self.partial_fit(new[FEATURES])
+        last = new.sort_values(['created_at', 'id']).iloc[-1]
+        self.watermark = (pd.Timestamp(last['created_at']).isoformat(), int(last['id']))
+        return len(new)
+
+    def predict(self, features):
+        return self.kmeans.predict(self.scaler.transform(np.asarray(features, dtype=np.float64)))
+
+    def save(self, path):
+        tmp_file = path + '.tmp'
+        joblib.dump(self, tmp_file)
+        os.replace(tmp_file, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Load a saved model, or start a new one if there is none"""
+        if os.path.exists(path):
+            return joblib.load(path)
+        return cls(**kwargs)
+
+def cluster_totals(labels, survey_data, n_clusters):
+    """Per-cluster row count, hour sum and data length sum; add them up over batches"""
+    return np.stack([
+        np.bincount(labels, minlength=n_clusters).astype(np.float64),
+        np.bincount(labels, survey_data['hour'].to_numpy(), n_clusters),
+        np.bincount(labels, survey_data['data_length'].to_numpy(), n_clusters),
+    ])
+
+def profile_from_totals(totals):
+    """Per-cluster row count, mean hour and mean data length from cluster_totals"""
+    counts, hours, lengths = totals
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({'count': counts, 'avg_hour': hours / counts, 'avg_length': lengths / counts})
+
+def cluster_profile(labels, survey_data, n_clusters):
+    """Per-cluster row count, mean hour and mean data length in one pass each"""
+    return profile_from_totals(cluster_totals(labels, survey_data, n_clusters))
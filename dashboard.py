@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Dashboard Rendering - Aggregate First, Then Plot
+================================================
+Draws the survey analysis dashboard from pre-aggregated series instead of one
+marker per submission, so render time stays flat as the tables grow.
+
+- Daily and hourly panels plot counts (one point per day / hour).
+- The length panel plots histogram bin counts.
+- The cumulative growth curve is reduced to at most `max_points` points with
+  Largest-Triangle-Three-Buckets (LTTB), which keeps its visual shape.
+
+`dashboard_series` returns plain lists, so the same series can be written as
+JSON for a web front end (`write_series`). Rendering uses the Agg canvas
+directly (no pyplot, no window) and can run on a background thread with
+`render_async`, so a headless run never blocks on `plt.show()`.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DEFAULT_MAX_POINTS = 2000
+DEFAULT_DPI = 120
+LENGTH_BINS = 20
+
+_renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dashboard')
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a series sorted by x
+
+    Returns the indices of the kept points; the first and last are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+def dashboard_series(daily, hourly, timestamps=None, lengths=None, max_points=DEFAULT_MAX_POINTS,
+                     length_histogram=None):
+    """
+    JSON-ready series for the four dashboard panels
+
+    `daily` and `hourly` map dates / hours to counts. Without per-row
+    `timestamps` the cumulative curve is drawn from the daily counts, and
+    without `lengths` (or a `length_histogram` of (counts, edges) added up
+    batch by batch) the length panel is left empty.
+    """
+    daily = pd.Series(daily, dtype='int64').sort_index()
+    hourly = pd.Series(hourly, dtype='int64').sort_index()
+    series = {
+        'daily': {'x': [str(d) for d in daily.index], 'y': daily.tolist()},
+        'hourly': {'x': [int(h) for h in hourly.index], 'y': hourly.tolist()},
+        'lengths': None,
+    }
+
+    if timestamps is not None and len(timestamps):
+        times = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True, format='ISO8601'))
+        ns = np.sort(times.to_numpy(dtype='datetime64[ns]').view(np.int64))
+        counts = np.arange(1, len(ns) + 1)
+        kept = lttb(ns, counts, max_points)
+        x = pd.to_datetime(ns[kept], utc=True)
+        series['cumulative'] = {'x': [t.isoformat() for t in x], 'y': counts[kept].tolist()}
+    else:
+        cumulative = daily.cumsum()
+        series['cumulative'] = {'x': [str(d) for d in cumulative.index], 'y': cumulative.tolist()}
+
+    if lengths is not None and len(lengths):
+        counts, edges = np.histogram(np.asarray(lengths, dtype=np.float64), bins=LENGTH_BINS)
+        series['lengths'] = {'edges': edges.tolist(), 'counts': counts.tolist()}
+    elif length_histogram is not None:
+        counts, edges = length_histogram
+        series['lengths'] = {'edges': np.asarray(edges).tolist(), 'counts': np.asarray(counts).tolist()}
+
+    return series
+
+def write_series(series, path):
+    """Write dashboard series as JSON for a web front end"""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(series, f)
+    os.replace(tmp_file, path)
+    return path
+
+def render_dashboard(series, path, dpi=DEFAULT_DPI):
+    """Render the 2x2 survey dashboard from `dashboard_series` output to `path`"""
+    fig = Figure(figsize=(15, 10))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 2)
+    fig.suptitle('📊 Mobile App Survey Analysis Dashboard', fontsize=16, fontweight='bold')
+
+    # 1. Submissions over time
+    daily = series['daily']
+    dates = pd.to_datetime(daily['x'])
+    axes[0, 0].plot(dates, daily['y'], marker='o' if len(dates) <= 60 else None, linewidth=2)
+    axes[0, 0].set_title('📅 Daily Survey Submissions')
+    axes[0, 0].set_xlabel('Date')
+    axes[0, 0].set_ylabel('Number of Submissions')
+    axes[0, 0].tick_params(axis='x', rotation=45)
+
+    # 2. Hourly distribution
+    axes[0, 1].bar(series['hourly']['x'], series['hourly']['y'], color='skyblue')
+    axes[0, 1].set_title('⏰ Submissions by Hour of Day')
+    axes[0, 1].set_xlabel('Hour')
+    axes[0, 1].set_ylabel('Number of Submissions')
+
+    # 3. Data size distribution
+    lengths = series['lengths']
+    if lengths:
+        axes[1, 0].stairs(lengths['counts'], lengths['edges'], fill=True, alpha=0.7, color='lightcoral')
+    else:
+        axes[1, 0].text(0.5, 0.5, 'No per-row lengths in this view', ha='center', va='center',
+                        transform=axes[1, 0].transAxes)
+    axes[1, 0].set_title('📊 Encrypted Data Size Distribution')
+    axes[1, 0].set_xlabel('Data Length (characters)')
+    axes[1, 0].set_ylabel('Frequency')
+
+    # 4. Cumulative submissions
+    cumulative = series['cumulative']
+    axes[1, 1].plot(pd.to_datetime(cumulative['x'], utc=True, format='ISO8601'), cumulative['y'], linewidth=2)
+    axes[1, 1].set_title('📈 Cumulative Survey Growth')
+    axes[1, 1].set_xlabel('Time')
+    axes[1, 1].set_ylabel('Total Submissions')
+    axes[1, 1].tick_params(axis='x', rotation=45)
+
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    return path
+
+def render_async(series, path, dpi=DEFAULT_DPI):
+    """Render on the background worker; returns a Future of the output path"""
+    return _renderer.submit(render_dashboard, series, path, dpi)
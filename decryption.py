@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Batched AES-CBC Decryption Engine
+=================================
+Decrypts the `hash_data` (survey) and `recog_text` (OCR) columns written by the
+mobile app. Survey.jsx and Ocr.jsx encrypt with CryptoJS AES-CBC/PKCS7 and store
+the base64 ciphertext.
+
+Whole columns are decrypted at once: every ciphertext in a batch is decoded into
+one block array, the block cipher runs over all blocks in a single call, and the
+CBC chaining is one vectorized XOR. Large columns are split across a process
+pool where each worker sets up the cipher exactly once.
+
+The app's key is 27 bytes long. CryptoJS accepts that and derives a 13-round
+key schedule from it that standard AES libraries refuse, so for such keys the
+CryptoJS schedule is reproduced here and the rounds run in NumPy. Standard
+16/24/32-byte keys go through PyCryptodome.
+
+`encrypt_batch` mirrors the app's encryption so tests and benchmarks can build
+realistic ciphertext columns.
+"""
+
+import binascii
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from Crypto.Cipher import AES
+
+# Key and IV hard-coded in Survey.jsx and Ocr.jsx
+APP_KEY = b'v5T2RpmzkuU2qyMQXVYyqx7Wpnv'
+APP_IV = b'EqZywEkfyeZkpGt2'
+
+# Rows handed to a worker process at a time
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Picker values offered by Survey.jsx, in increasing order
+SURVEY_CHOICES = {
+    'amount': ['below $50', 'between $100-$200', 'above $300'],
+    'purchases': ['below 5', 'between 5-10', 'between 10-15', 'above 15'],
+    'likely': ['not likely', 'somewhat likely', 'likely'],
+}
+
+# `allData` template from Survey.jsx
+SURVEY_PATTERN = (
+    r'(?s)^name: (?P<name>.*?), location: (?P<location>.*?), '
+    r'occupation: (?P<occupation>.*?), amount: (?P<amount>.*?), '
+    r'purchases: (?P<purchases>.*?), likely: (?P<likely>.*)$'
+)
+
+# ---------------------------------------------------------------------------
+# AES tables
+# ---------------------------------------------------------------------------
+
+def _xtime(a):
+    return ((a << 1) ^ 0x11b) if a & 0x80 else a << 1
+
+def _gf_mul(a, b):
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a = _xtime(a)
+        b >>= 1
+    return result
+
+def _build_sbox():
+    sbox = [0] * 256
+    for x in range(256):
+        inv = next((y for y in range(1, 256) if _gf_mul(x, y) == 1), 0)
+        s = inv
+        for shift in range(1, 5):
+            s ^= ((inv << shift) | (inv >> (8 - shift))) & 0xff
+        sbox[x] = s ^ 0x63
+    return sbox
+
+SBOX = _build_sbox()
+INV_SBOX = np.zeros(256, dtype=np.uint8)
+INV_SBOX[SBOX] = np.arange(256, dtype=np.uint8)
+
+_MUL = {m: np.array([_gf_mul(a, m) for a in range(256)], dtype=np.uint8) for m in (9, 11, 13, 14)}
+
+RCON = [0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36]
+
+# Inverse round tables: InvSubBytes + InvMixColumns for the byte in each row,
+# packed as big-endian column words
+_INV_MIX = [(14, 9, 13, 11), (11, 14, 9, 13), (13, 11, 14, 9), (9, 13, 11, 14)]
+_TD = [
+    np.array([(_gf_mul(s, m0) << 24) | (_gf_mul(s, m1) << 16) | (_gf_mul(s, m2) << 8) | _gf_mul(s, m3)
+              for s in INV_SBOX.tolist()], dtype=np.uint32)
+    for m0, m1, m2, m3 in _INV_MIX
+]
+_INV_SBOX_WORDS = [INV_SBOX.astype(np.uint32) << shift for shift in (24, 16, 8, 0)]
+
+# Forward tables, used to produce app-compatible ciphertexts for tests and benchmarks
+_MIX = [(2, 1, 1, 3), (3, 2, 1, 1), (1, 3, 2, 1), (1, 1, 3, 2)]
+_TE = [
+    np.array([(_gf_mul(s, m0) << 24) | (_gf_mul(s, m1) << 16) | (_gf_mul(s, m2) << 8) | _gf_mul(s, m3)
+              for s in SBOX], dtype=np.uint32)
+    for m0, m1, m2, m3 in _MIX
+]
+_SBOX_WORDS = [np.array(SBOX, dtype=np.uint32) << shift for shift in (24, 16, 8, 0)]
+
+# ---------------------------------------------------------------------------
+# Block ciphers
+# ---------------------------------------------------------------------------
+
+def _sub_word(t):
+    return (SBOX[t >> 24] << 24) | (SBOX[(t >> 16) & 0xff] << 16) | (SBOX[(t >> 8) & 0xff] << 8) | SBOX[t & 0xff]
+
+def cryptojs_round_keys(key):
+    """
+    Round keys exactly as CryptoJS derives them, as a (rounds + 1, 16) array
+
+    CryptoJS sizes the schedule from `sigBytes / 4` without checking it is a
+    whole number. For odd key lengths the fractional word indices read
+    `undefined`, which XORs as 0; that behaviour is reproduced here.
+    """
+    words = [int.from_bytes(key[i:i + 4].ljust(4, b'\0'), 'big') for i in range(0, len(key), 4)]
+    key_size = len(key) / 4
+    ks_rows = len(key) + 28
+
+    schedule = []
+    for row in range(ks_rows):
+        if row < key_size:
+            schedule.append(words[row])
+            continue
+        t = schedule[row - 1]
+        if not row % key_size:
+            t = ((t << 8) | (t >> 24)) & 0xffffffff
+            t = _sub_word(t)
+            rcon_index = int(row // key_size)
+            t ^= (RCON[rcon_index] if rcon_index < len(RCON) else 0) << 24
+        elif key_size > 6 and row % key_size == 4:
+            t = _sub_word(t)
+        back = row - key_size
+        schedule.append((schedule[int(back)] if back == int(back) else 0) ^ t)
+
+    # CryptoJS runs ceil(nRounds) - 1 full rounds plus the final one
+    rounds = int(np.ceil(key_size + 6))
+    schedule += [0] * (4 * (rounds + 1) - len(schedule))
+    words = np.array(schedule[:4 * (rounds + 1)], dtype='>u4')
+    return words.view(np.uint8).reshape(rounds + 1, 16)
+
+def _inv_mix_columns(state):
+    cols = state.reshape(-1, 4, 4)
+    a0, a1, a2, a3 = cols[:, :, 0], cols[:, :, 1], cols[:, :, 2], cols[:, :, 3]
+    m9, m11, m13, m14 = _MUL[9], _MUL[11], _MUL[13], _MUL[14]
+    out = np.empty_like(cols)
+    out[:, :, 0] = m14[a0] ^ m11[a1] ^ m13[a2] ^ m9[a3]
+    out[:, :, 1] = m9[a0] ^ m14[a1] ^ m11[a2] ^ m13[a3]
+    out[:, :, 2] = m13[a0] ^ m9[a1] ^ m14[a2] ^ m11[a3]
+    out[:, :, 3] = m11[a0] ^ m13[a1] ^ m9[a2] ^ m14[a3]
+    return out.reshape(-1, 16)
+
+def _to_words(blocks):
+    return blocks.view('>u4').astype(np.uint32)
+
+def _numpy_block_decrypter(key):
+    # Equivalent inverse cipher (FIPS-197 5.3.5): middle round keys are
+    # pre-mixed so every round is four table lookups per column
+    round_keys = cryptojs_round_keys(key)
+    round_keys[1:-1] = _inv_mix_columns(round_keys[1:-1])
+    round_words = _to_words(round_keys)
+    td0, td1, td2, td3 = _TD
+    sb0, sb1, sb2, sb3 = _INV_SBOX_WORDS
+
+    def decrypt_blocks(blocks):
+        s = _to_words(np.ascontiguousarray(blocks)) ^ round_words[-1]
+        s0, s1, s2, s3 = s[:, 0], s[:, 1], s[:, 2], s[:, 3]
+        for rk in round_words[-2:0:-1]:
+            b0, b1, b2, b3 = (s0 >> 24, s1 >> 24, s2 >> 24, s3 >> 24)
+            c0, c1, c2, c3 = ((s0 >> 16) & 0xff, (s1 >> 16) & 0xff, (s2 >> 16) & 0xff, (s3 >> 16) & 0xff)
+            d0, d1, d2, d3 = ((s0 >> 8) & 0xff, (s1 >> 8) & 0xff, (s2 >> 8) & 0xff, (s3 >> 8) & 0xff)
+            e0, e1, e2, e3 = (s0 & 0xff, s1 & 0xff, s2 & 0xff, s3 & 0xff)
+            s0, s1, s2, s3 = (
+                td0[b0] ^ td1[c3] ^ td2[d2] ^ td3[e1] ^ rk[0],
+                td0[b1] ^ td1[c0] ^ td2[d3] ^ td3[e2] ^ rk[1],
+                td0[b2] ^ td1[c1] ^ td2[d0] ^ td3[e3] ^ rk[2],
+                td0[b3] ^ td1[c2] ^ td2[d1] ^ td3[e0] ^ rk[3],
+            )
+        rk = round_words[0]
+        out = np.empty((len(s0), 4), dtype='>u4')
+        for c, (w0, w1, w2, w3) in enumerate([(s0, s3, s2, s1), (s1, s0, s3, s2),
+                                              (s2, s1, s0, s3), (s3, s2, s1, s0)]):
+            out[:, c] = (sb0[w0 >> 24] ^ sb1[(w1 >> 16) & 0xff] ^ sb2[(w2 >> 8) & 0xff]
+                         ^ sb3[w3 & 0xff] ^ rk[c])
+        return out.view(np.uint8)
+
+    return decrypt_blocks
+
+def _pycryptodome_block_decrypter(key):
+    cipher = AES.new(key, AES.MODE_ECB)
+
+    def decrypt_blocks(blocks):
+        plain = cipher.decrypt(blocks.tobytes())
+        return np.frombuffer(plain, dtype=np.uint8).reshape(-1, 16)
+
+    return decrypt_blocks
+
+def block_decrypter(key):
+    """Return a function decrypting an (n, 16) uint8 array of AES blocks"""
+    if len(key) in (16, 24, 32):
+        return _pycryptodome_block_decrypter(key)
+    return _numpy_block_decrypter(key)
+
+def _numpy_block_encrypter(key):
+    round_words = _to_words(cryptojs_round_keys(key))
+    te0, te1, te2, te3 = _TE
+    sb0, sb1, sb2, sb3 = _SBOX_WORDS
+
+    def encrypt_blocks(blocks):
+        s = _to_words(np.ascontiguousarray(blocks)) ^ round_words[0]
+        s0, s1, s2, s3 = s[:, 0], s[:, 1], s[:, 2], s[:, 3]
+        for rk in round_words[1:-1]:
+            s0, s1, s2, s3 = (
+                te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xff] ^ te2[(s2 >> 8) & 0xff] ^ te3[s3 & 0xff] ^ rk[0],
+                te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xff] ^ te2[(s3 >> 8) & 0xff] ^ te3[s0 & 0xff] ^ rk[1],
+                te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xff] ^ te2[(s0 >> 8) & 0xff] ^ te3[s1 & 0xff] ^ rk[2],
+                te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xff] ^ te2[(s1 >> 8) & 0xff] ^ te3[s2 & 0xff] ^ rk[3],
+            )
+        rk = round_words[-1]
+        out = np.empty((len(s0), 4), dtype='>u4')
+        for c, (w0, w1, w2, w3) in enumerate([(s0, s1, s2, s3), (s1, s2, s3, s0),
+                                              (s2, s3, s0, s1), (s3, s0, s1, s2)]):
+            out[:, c] = (sb0[w0 >> 24] ^ sb1[(w1 >> 16) & 0xff] ^ sb2[(w2 >> 8) & 0xff]
+                         ^ sb3[w3 & 0xff] ^ rk[c])
+        return out.view(np.uint8)
+
+    return encrypt_blocks
+
+def block_encrypter(key):
+    """Return a function encrypting an (n, 16) uint8 array of AES blocks"""
+    if len(key) in (16, 24, 32):
+        cipher = AES.new(key, AES.MODE_ECB)
+        return lambda blocks: np.frombuffer(cipher.encrypt(blocks.tobytes()), dtype=np.uint8).reshape(-1, 16)
+    return _numpy_block_encrypter(key)
+
+# ---------------------------------------------------------------------------
+# Column decryption
+# ---------------------------------------------------------------------------
+
+def _decode(value):
+    try:
+        data = binascii.a2b_base64(value)
+    except (binascii.Error, TypeError, ValueError):
+        return b''
+    return data if len(data) % 16 == 0 else b''
+
+def decrypt_batch(values, decrypt_blocks, iv=APP_IV):
+    """
+    Decrypt a list of base64 ciphertexts with one block-cipher call
+
+    Returns a list of plaintext strings, with None wherever the value is not
+    valid base64, has a bad length, bad padding or is not UTF-8.
+    """
+    raw = [_decode(value) for value in values]
+    results = [None] * len(raw)
+
+    lengths = np.fromiter(map(len, raw), dtype=np.int64, count=len(raw))
+    valid = np.flatnonzero(lengths)
+    if not len(valid):
+        return results
+
+    blocks = np.frombuffer(b''.join(raw), dtype=np.uint8).reshape(-1, 16)
+    ends = np.cumsum(lengths)[valid]
+    starts = ends - lengths[valid]
+
+    # CBC: every block is XORed with the previous ciphertext block, or the IV
+    previous = np.empty_like(blocks)
+    previous[1:] = blocks[:-1]
+    previous[starts // 16] = np.frombuffer(iv, dtype=np.uint8)
+    plain = (decrypt_blocks(blocks) ^ previous).tobytes()
+
+    for i, start, end in zip(valid.tolist(), starts.tolist(), ends.tolist()):
+        pad = plain[end - 1]
+        if not 1 <= pad <= 16 or plain[end - pad:end] != bytes([pad]) * pad:
+            continue
+        try:
+            results[i] = plain[start:end - pad].decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    return results
+
+def encrypt_batch(plaintexts, encrypt_blocks, iv=APP_IV):
+    """
+    Encrypt strings exactly as the app's CryptoJS.AES.encrypt call does
+
+    Used to build realistic `hash_data`/`recog_text` values for tests and
+    benchmarks. CBC is sequential within a message, so the batch advances one
+    block position at a time across all messages together.
+    """
+    padded = []
+    for text in plaintexts:
+        data = text.encode('utf-8')
+        pad = 16 - len(data) % 16
+        padded.append(data + bytes([pad]) * pad)
+    if not padded:
+        return []
+
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded)) // 16
+    blocks = np.frombuffer(b''.join(padded), dtype=np.uint8).reshape(-1, 16).copy()
+    starts = np.cumsum(lengths) - lengths
+    previous = np.tile(np.frombuffer(iv, dtype=np.uint8), (len(padded), 1))
+
+    for position in range(int(lengths.max())):
+        active = np.flatnonzero(lengths > position)
+        rows = starts[active] + position
+        blocks[rows] = encrypt_blocks(blocks[rows] ^ previous[active])
+        previous[active] = blocks[rows]
+
+    data = blocks.tobytes()
+    return [binascii.b2a_base64(data[start * 16:(start + n) * 16], newline=False).decode('ascii')
+            for start, n in zip(starts.tolist(), lengths.tolist())]
+
+_worker_decrypt_blocks = None
+
+def _init_worker(key):
+    global _worker_decrypt_blocks
+    _worker_decrypt_blocks = block_decrypter(key)
+
+def _decrypt_chunk(values, iv):
+    return decrypt_batch(values, _worker_decrypt_blocks, iv)
+
+def decrypt_column(values, key=APP_KEY, iv=APP_IV, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Decrypt a column of app ciphertexts into a Series of plaintext strings
+
+    Columns larger than one chunk are split across `workers` processes
+    (default: all cores). Undecryptable values come back as None.
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    values = list(values)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(values) <= chunk_size:
+        results = decrypt_batch(values, block_decrypter(key), iv)
+    else:
+        chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 initializer=_init_worker, initargs=(key,)) as pool:
+            results = [text for part in pool.map(_decrypt_chunk, chunks, [iv] * len(chunks))
+                       for text in part]
+
+    return pd.Series(results, index=index, dtype=object)
+
+# ---------------------------------------------------------------------------
+# Survey parsing
+# ---------------------------------------------------------------------------
+
+def parse_survey_answers(plaintexts):
+    """
+    Split decrypted survey strings into typed columns
+
+    Free-text answers stay strings; picker answers become ordered categoricals
+    plus a numeric `<answer>_level` column (NaN when unrecognised).
+    """
+    answers = pd.Series(plaintexts, dtype=object).str.extract(SURVEY_PATTERN)
+
+    for column, choices in SURVEY_CHOICES.items():
+        answers[column] = pd.Categorical(answers[column], categories=choices, ordered=True)
+        codes = answers[column].cat.codes.astype('float64')
+        answers[f'{column}_level'] = codes.where(codes >= 0)
+
+    return answers
+
+def decrypt_survey_column(values, key=APP_KEY, iv=APP_IV, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Decrypt a `hash_data` column straight into typed survey columns"""
+    return parse_survey_answers(decrypt_column(values, key, iv, workers, chunk_size))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Ciphertext Dedup Index
+======================
+The app encrypts with a fixed key and IV (Survey.jsx, Ocr.jsx), so a retried
+or double-tapped submission arrives as exactly the same `hash_data` /
+`recog_text` string. Comparing ciphertexts finds those duplicates before
+anything is decrypted or noised.
+
+- Each ciphertext is reduced to a 16-byte BLAKE2b digest.
+- Digests already seen are kept per table in SQLite (a WITHOUT ROWID table
+  keyed on the digest), so duplicates are recognized across runs. Each batch
+  is checked with one `IN` query against the primary key; nothing is loaded
+  at startup, so opening a large index costs nothing.
+- New digests stay in an open transaction until `commit()`, so a run that
+  crashes before its checkpoint does not mark unprocessed rows as seen.
+
+    index = DedupIndex('dp_dedup_index.sqlite')
+    for batch in source.iter_batches('fable'):
+        batch = index.drop_duplicates('fable', batch)
+        ...
+        index.commit()
+    index.stats  # {'fable': {'rows': 1200, 'duplicates': 37}}
+
+With `path=None` the digests are kept in a set in memory and only
+duplicates within one run are removed.
+"""
+
+import hashlib
+import sqlite3
+
+from aggregates import LENGTH_COLUMNS
+
+DEFAULT_DEDUP_FILE = 'dedup_index.sqlite'
+DIGEST_SIZE = 16
+
+# Encrypted column of each app table
+CIPHERTEXT_COLUMNS = LENGTH_COLUMNS
+
+# SQLite caps the number of ? parameters of one statement
+_LOOKUP_CHUNK = 500
+
+def ciphertext_digest(ciphertext):
+    return hashlib.blake2b(ciphertext.encode(), digest_size=DIGEST_SIZE).digest()
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+class DedupIndex:
+    """Persistent set of ciphertext digests per table"""
+
+    def __init__(self, path=DEFAULT_DEDUP_FILE):
+        self.path = path
+        self.connection = None
+        if path:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+        # table -> digest set in memory, or -> quoted SQLite table name
+        self.tables = {}
+        self.stats = {}
+
+    def _table(self, table):
+        if table not in self.tables:
+            if self.connection is None:
+                self.tables[table] = set()
+            else:
+                name = _quote_identifier(f'seen_{table}')
+                self.connection.execute(f'CREATE TABLE IF NOT EXISTS {name} (digest BLOB PRIMARY KEY) WITHOUT ROWID')
+                self.tables[table] = name
+        return self.tables[table]
+
+    def _stored(self, name, digests):
+        """The subset of `digests` already in the index"""
+        if isinstance(name, set):
+            return digests & name
+        digests = list(digests)
+        stored = set()
+        for begin in range(0, len(digests), _LOOKUP_CHUNK):
+            chunk = digests[begin:begin + _LOOKUP_CHUNK]
+            stored.update(digest for (digest,) in self.connection.execute(
+                f'SELECT digest FROM {name} WHERE digest IN ({", ".join("?" * len(chunk))})', chunk))
+        return stored
+
+    def mark_new(self, table, ciphertexts):
+        """
+        True for every ciphertext not seen before (in the index or earlier in
+        this call), and record those; missing ciphertexts always count as new
+        """
+        name = self._table(table)
+        digests = [None if ciphertext is None else ciphertext_digest(ciphertext) for ciphertext in ciphertexts]
+        stored = self._stored(name, {digest for digest in digests if digest is not None})
+
+        keep, fresh = [], set()
+        for digest in digests:
+            new = digest is None or (digest not in stored and digest not in fresh)
+            if new and digest is not None:
+                fresh.add(digest)
+            keep.append(new)
+
+        if isinstance(name, set):
+            name.update(fresh)
+        else:
+            self.connection.executemany(f'INSERT OR IGNORE INTO {name} (digest) VALUES (?)',
+                                        [(digest,) for digest in fresh])
+
+        stats = self.stats.setdefault(table, {'rows': 0, 'duplicates': 0})
+        stats['rows'] += len(keep)
+        stats['duplicates'] += len(keep) - sum(keep)
+        return keep
+
+    def drop_duplicates(self, table, frame, column=None):
+        """Rows of `frame` whose ciphertext (default: the table's encrypted column) is new"""
+        keep = self.mark_new(table, frame[column or CIPHERTEXT_COLUMNS[table]].tolist())
+        return frame[keep]
+
+    def count(self, table):
+        name = self._table(table)
+        if isinstance(name, set):
+            return len(name)
+        return self.connection.execute(f'SELECT COUNT(*) FROM {name}').fetchone()[0]
+
+    def commit(self):
+        """Make the digests recorded so far permanent"""
+        if self.connection is not None:
+            self.connection.commit()
+
+    def close(self):
+        """Close without committing; digests since the last commit() are forgotten"""
+        if self.connection is not None:
+            self.connection.close()
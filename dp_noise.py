@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Vectorized Laplace Noise Engine
+===============================
+Adds Laplace noise to every sensitive column of a dataset in one batched draw.
+
+Replaces the per-column `LaplaceBoundedDomain` loop: bounds and sensitivity
+are held per column as arrays, one (rows x columns) noise block is drawn per
+chunk, and noise plus clipping are applied in place on that block. Noising a
+frame therefore costs about one pass over its sensitive columns, and the same
+mechanism can be reused chunk by chunk with fixed bounds.
+
+Seeded releases are reproducible and safe to split across processes. Rows
+are grouped into fixed blocks of NOISE_BLOCK_ROWS by their position in the
+release, and block b draws from its own generator, child b of one root
+SeedSequence. Noise therefore depends only on (root seed, row position), so
+any worker count and any chunk size give identical output, and a release can
+be regenerated bit for bit from its recorded seed.
+
+    seed = new_root_seed()
+    mechanism.apply(chunk, seed=seed, start=rows_before_chunk)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Rows noised per block; bounds the size of the temporary noise array
+DEFAULT_CHUNK_ROWS = 1_000_000
+# Rows per independent generator stream in seeded releases; part of the
+# release format, changing it changes every seeded output
+NOISE_BLOCK_ROWS = 65_536
+
+def new_root_seed():
+    """Fresh 128-bit root seed from OS entropy, to be recorded with the release"""
+    return int(np.random.SeedSequence().entropy)
+
+def noise_stream(seed, block):
+    """Generator for rows [block * NOISE_BLOCK_ROWS, (block + 1) * NOISE_BLOCK_ROWS) of a release"""
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(block,))))
+
+def laplace_variates(rng, shape):
+    """Standard Laplace draws by inverting the CDF of uniform draws"""
+    u = rng.random(shape)
+    u -= 0.5
+    magnitude = np.abs(u)
+    # 1 - 2|u| is in [0, 1]; the floor keeps log finite for u == -0.5
+    magnitude *= -2.0
+    magnitude += 1.0
+    np.maximum(magnitude, np.finfo(np.float64).tiny, out=magnitude)
+    np.log(magnitude, out=magnitude)
+    magnitude *= -np.sign(u)
+    return magnitude
+
+class LaplaceNoise:
+    """
+    Laplace mechanism over several columns at once
+
+    Every value in column j gets noise with scale sensitivity[j] / epsilon and
+    is clipped to [lower[j], upper[j]].
+    """
+
+    def __init__(self, columns, epsilon, lower, upper, sensitivity=1.0):
+        if epsilon <= 0:
+            raise ValueError("epsilon must be positive")
+
+        self.columns = list(columns)
+        self.epsilon = float(epsilon)
+        self.lower = np.broadcast_to(np.asarray(lower, dtype=np.float64), (len(self.columns),)).copy()
+        self.upper = np.broadcast_to(np.asarray(upper, dtype=np.float64), (len(self.columns),)).copy()
+        self.sensitivity = np.broadcast_to(np.asarray(sensitivity, dtype=np.float64), (len(self.columns),)).copy()
+
+        if np.any(self.lower > self.upper):
+            raise ValueError("every lower bound must be <= its upper bound")
+        if np.any(self.sensitivity < 0):
+            raise ValueError("sensitivity must be non-negative")
+
+        self.scale = self.sensitivity / self.epsilon
+
+    @classmethod
+    def from_bounds(cls, bounds, epsilon, sensitivity=1.0):
+        """Build from a {column: (lower, upper)} mapping"""
+        columns = list(bounds)
+        if isinstance(sensitivity, dict):
+            sensitivity = [sensitivity[col] for col in columns]
+        return cls(columns, epsilon,
+                   [bounds[col][0] for col in columns],
+                   [bounds[col][1] for col in columns],
+                   sensitivity)
+
+    @classmethod
+    def from_frame(cls, data, columns, epsilon, sensitivity=1.0):
+        """
+        Build with bounds taken from the data in a single min/max pass
+
+        Data-derived bounds are not themselves private; prefer declared bounds
+        (from_bounds) whenever the domain is known.
+        """
+        columns = [col for col in columns if col in data.columns]
+        values = data[columns].to_numpy(dtype=np.float64)
+        return cls(columns, epsilon, np.nanmin(values, axis=0), np.nanmax(values, axis=0), sensitivity)
+
+    def noise_array(self, values, rng=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Noise a 2-D float array (rows x self.columns) in place and return it
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        for start in range(0, len(values), chunk_rows):
+            block = values[start:start + chunk_rows]
+            noise = rng.laplace(0.0, 1.0, size=block.shape)
+            noise *= self.scale
+            block += noise
+            np.clip(block, self.lower, self.upper, out=block)
+        return values
+
+    def _noise_block(self, values, seed, start, block):
+        end = start + len(values)
+        block_start = block * NOISE_BLOCK_ROWS
+        lo, hi = max(start, block_start), min(end, block_start + NOISE_BLOCK_ROWS)
+        rng = noise_stream(seed, block)
+        # Each variate consumes one 64-bit step of the stream, so skipping the
+        # block's earlier rows lands exactly where a full draw would be
+        rng.bit_generator.advance((lo - block_start) * len(self.columns))
+        noise = laplace_variates(rng, (hi - lo, len(self.columns)))
+        noise *= self.scale
+        rows = values[lo - start:hi - start]
+        rows += noise
+        np.clip(rows, self.lower, self.upper, out=rows)
+
+    def noise_rows(self, values, seed, start=0, workers=1):
+        """
+        Noise rows start.. of a seeded release (a 2-D float array) in place
+
+        The result for a row depends only on `seed` and its position, not on
+        how the release is chunked. Blocks are independent, so `workers`
+        threads fill them in parallel (the draws and arithmetic release the GIL).
+        """
+        if not len(values):
+            return values
+        blocks = range(start // NOISE_BLOCK_ROWS, (start + len(values) - 1) // NOISE_BLOCK_ROWS + 1)
+        if workers > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(lambda block: self._noise_block(values, seed, start, block), blocks))
+        else:
+            for block in blocks:
+                self._noise_block(values, seed, start, block)
+        return values
+
+    def apply(self, data, inplace=False, dtype=None, rng=None, chunk_rows=DEFAULT_CHUNK_ROWS, seed=None, start=0,
+              workers=1):
+        """
+        Noise the mechanism's columns of a DataFrame
+
+        With inplace=True the frame itself is updated, otherwise only the
+        noised columns are copied. dtype=np.float32 halves the output size.
+        With `seed`, the frame is rows start.. of a reproducible release,
+        noised on `workers` threads (see noise_rows); otherwise `rng`
+        (default: fresh entropy) is used.
+        """
+        dtype = np.dtype(dtype or np.float64)
+        out = data if inplace else data.copy(deep=False)
+
+        values = data[self.columns].to_numpy(dtype=np.float64, copy=True)
+        if seed is not None:
+            self.noise_rows(values, seed, start, workers)
+        else:
+            self.noise_array(values, rng, chunk_rows)
+
+        for j, col in enumerate(self.columns):
+            out[col] = values[:, j].astype(dtype, copy=False)
+        return out
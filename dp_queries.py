@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Differentially Private Aggregate Queries
+========================================
+Answers counts, sums, means and histograms over decrypted survey data (or the
+churn dataset) without ever building a noised per-row copy.
+
+Each query computes the exact aggregate from the columns with one vectorized
+reduction (`np.bincount`, `np.sum`) and adds Laplace noise to that aggregate
+only. Noise scales with the sensitivity of the aggregate rather than with every
+record, so answers are far more accurate than statistics of a noised dataset.
+
+Every query spends epsilon from a per-dataset budget. The `PrivacyAccountant`
+keeps that ledger (optionally persisted to JSON) and refuses queries once a
+dataset's budget is used up.
+
+Data that is only ever seen batch by batch is folded into `QueryTotals`
+(row count, clamped sums, category counts) and queried the same way, without
+keeping any rows.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LEDGER_FILE = 'privacy_budget.json'
+
+class PrivacyBudgetExceeded(RuntimeError):
+    """Raised when a query would spend more epsilon than a dataset has left"""
+
+class PrivacyAccountant:
+    """
+    Per-dataset epsilon ledger using sequential composition
+
+    Each dataset gets `total_epsilon` unless registered with its own budget.
+    With `ledger_file` set, every spend is written through to disk so the
+    budget survives across runs and dashboards.
+    """
+
+    def __init__(self, total_epsilon=1.0, ledger_file=None):
+        self.total_epsilon = float(total_epsilon)
+        self.ledger_file = ledger_file
+        self.ledger = {}
+        if ledger_file and os.path.exists(ledger_file):
+            with open(ledger_file) as f:
+                self.ledger = json.load(f)
+
+    def register(self, dataset, budget):
+        """Give a dataset its own total budget"""
+        self._entry(dataset)['budget'] = float(budget)
+        self._save()
+
+    def _entry(self, dataset):
+        return self.ledger.setdefault(dataset, {'budget': self.total_epsilon, 'spent': 0.0, 'queries': []})
+
+    def remaining(self, dataset):
+        entry = self._entry(dataset)
+        return entry['budget'] - entry['spent']
+
+    def spend(self, dataset, epsilon, query):
+        """Charge `epsilon` to `dataset`, or raise PrivacyBudgetExceeded"""
+        if epsilon <= 0:
+            raise ValueError("epsilon must be positive")
+        entry = self._entry(dataset)
+        # Tolerate float rounding when a budget is split into equal parts
+        if entry['spent'] + epsilon > entry['budget'] + 1e-9:
+            raise PrivacyBudgetExceeded(
+                f"{query} needs ε={epsilon:g} but only ε={self.remaining(dataset):g} "
+                f"of {entry['budget']:g} is left for '{dataset}'"
+            )
+        entry['spent'] += epsilon
+        entry['queries'].append({
+            'query': query,
+            'epsilon': epsilon,
+            'at': pd.Timestamp.now(tz='UTC').isoformat(),
+        })
+        self._save()
+
+    def _save(self):
+        if not self.ledger_file:
+            return
+        tmp_file = self.ledger_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.ledger, f, indent=2)
+        os.replace(tmp_file, self.ledger_file)
+
+class QueryTotals:
+    """
+    Exact totals of a dataset folded in batch by batch: the row count, the
+    clamped sum and count of each bounded column, and the count of every
+    declared category of each categorical column
+
+    Enough to answer DPQueryEngine's count, sum, mean and categorical
+    histogram without `where` masks; memory does not grow with the rows.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = dict(bounds)
+        self.rows = 0
+        self.sums = {column: 0.0 for column in self.bounds}
+        self.counts = {column: 0 for column in self.bounds}
+        self.categories = {}
+        self.histograms = {}
+
+    def update(self, batch):
+        self.rows += len(batch)
+        for column, (lower, upper) in self.bounds.items():
+            values = batch[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            self.sums[column] += float(np.clip(values, lower, upper).sum())
+            self.counts[column] += len(values)
+        for column in batch.columns:
+            series = batch[column]
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            categories = series.cat.categories
+            if column not in self.histograms:
+                self.categories[column] = categories
+                self.histograms[column] = np.zeros(len(categories), dtype=np.int64)
+            elif not categories.equals(self.categories[column]):
+                raise ValueError(f"'{column}' changed its declared categories between batches")
+            codes = series.cat.codes.to_numpy()
+            self.histograms[column] += np.bincount(codes[codes >= 0], minlength=len(categories))
+        return self
+
+class DPQueryEngine:
+    """
+    DP counts, sums, means and histograms over one dataset
+
+    `data` is a DataFrame or a QueryTotals. `bounds` maps numeric columns to
+    their declared (lower, upper) domain; values are clamped to it, which is
+    what bounds each query's sensitivity. QueryTotals carry their own bounds.
+    """
+
+    def __init__(self, data, dataset, accountant, bounds=None, rng=None):
+        self.data = data
+        self.dataset = dataset
+        self.accountant = accountant
+        self.totals = isinstance(data, QueryTotals)
+        self.bounds = dict(data.bounds if self.totals else bounds or {})
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def _laplace(self, values, sensitivity, epsilon):
+        return values + self.rng.laplace(0.0, sensitivity / epsilon, size=np.shape(values))
+
+    def _mask(self, where):
+        if where is None:
+            return None
+        if self.totals:
+            raise ValueError("where= needs row-level data, not QueryTotals")
+        return np.asarray(where(self.data) if callable(where) else where, dtype=bool)
+
+    def _clamped_sum(self, column, where=None):
+        """Exact sum and count of the clamped, non-missing values of `column`"""
+        if column not in self.bounds:
+            raise ValueError(f"no declared bounds for '{column}'; pass bounds={{'{column}': (lower, upper)}}")
+        lower, upper = self.bounds[column]
+        mask = self._mask(where)
+        if self.totals:
+            return self.data.sums[column], self.data.counts[column], lower, upper
+        values = self.data[column].to_numpy(dtype=np.float64)
+        if mask is not None:
+            values = values[mask]
+        values = values[~np.isnan(values)]
+        return np.clip(values, lower, upper).sum(), len(values), lower, upper
+
+    def count(self, epsilon, where=None):
+        """Noisy number of rows (optionally matching a boolean mask)"""
+        mask = self._mask(where)
+        self.accountant.spend(self.dataset, epsilon, 'count')
+        if self.totals:
+            exact = self.data.rows
+        else:
+            exact = len(self.data) if mask is None else int(mask.sum())
+        return max(0.0, float(self._laplace(exact, 1.0, epsilon)))
+
+    def sum(self, column, epsilon, where=None):
+        """Noisy sum of a bounded numeric column"""
+        total, _, lower, upper = self._clamped_sum(column, where)
+        self.accountant.spend(self.dataset, epsilon, f'sum({column})')
+        return float(self._laplace(total, max(abs(lower), abs(upper)), epsilon))
+
+    def mean(self, column, epsilon, where=None):
+        """
+        Noisy mean as noisy sum / noisy count, each spending epsilon / 2
+        """
+        total, count, lower, upper = self._clamped_sum(column, where)
+        self.accountant.spend(self.dataset, epsilon, f'mean({column})')
+        half = epsilon / 2
+        # Shift to the midpoint so the sum's sensitivity is half the range
+        midpoint = (lower + upper) / 2
+        noisy_sum = self._laplace(total - count * midpoint, (upper - lower) / 2, half)
+        noisy_count = max(1.0, self._laplace(count, 1.0, half))
+        return float(np.clip(noisy_sum / noisy_count + midpoint, lower, upper))
+
+    def histogram(self, column, epsilon, bins=None, labels=None, where=None):
+        """
+        Noisy count per category (or per numeric bin) as a Series
+
+        Categorical columns report every declared category, including empty
+        ones, so the set of released bins never depends on the data. Numeric
+        columns need `bins` as explicit edges, or as a number of equal-width
+        bins over the column's declared bounds; edges taken from the data's
+        own min/max would reveal them. Bins are disjoint, so the whole
+        histogram costs epsilon once.
+        """
+        if self.totals:
+            if bins is not None or column not in self.data.histograms:
+                raise ValueError(f"QueryTotals only count declared categories; '{column}' has none")
+            self._mask(where)
+            categories, exact = self.data.categories[column], self.data.histograms[column]
+            self.accountant.spend(self.dataset, epsilon, f'histogram({column})')
+            noisy = np.maximum(self._laplace(exact.astype(np.float64), 1.0, epsilon), 0.0)
+            return pd.Series(noisy, index=categories, name=column)
+
+        series = self.data[column]
+        mask = self._mask(where)
+        if mask is not None:
+            series = series[mask]
+
+        if bins is not None:
+            if np.ndim(bins) == 0:
+                if column not in self.bounds:
+                    raise ValueError(f"bins={bins} would take edges from the data; pass explicit edges or "
+                                     f"bounds={{'{column}': (lower, upper)}}")
+                lower, upper = self.bounds[column]
+                bins = np.linspace(lower, upper, int(bins) + 1)
+                series = series.clip(lower, upper)
+            series = pd.cut(series, bins=bins, labels=labels, include_lowest=True)
+        elif not isinstance(series.dtype, pd.CategoricalDtype):
+            raise ValueError(f"'{column}' is not categorical; pass bin edges as bins= for numeric columns")
+
+        self.accountant.spend(self.dataset, epsilon, f'histogram({column})')
+        categories = series.cat.categories
+        codes = series.cat.codes.to_numpy()
+        exact = np.bincount(codes[codes >= 0], minlength=len(categories))
+        noisy = np.maximum(self._laplace(exact.astype(np.float64), 1.0, epsilon), 0.0)
+        return pd.Series(noisy, index=categories, name=column)
+
+    def group_count(self, columns, epsilon):
+        """
+        Noisy counts for every combination of categorical `columns`
+
+        All category combinations are enumerated from the declared categories,
+        not just the ones present, and counted with a single bincount. Columns
+        must already be categorical: categories inferred from the data would
+        reveal which values occur.
+        """
+        if self.totals:
+            raise ValueError("group_count needs row-level data, not QueryTotals")
+        for col in columns:
+            if not isinstance(self.data[col].dtype, pd.CategoricalDtype):
+                raise ValueError(f"'{col}' is not categorical; declare its categories with "
+                                 f"pd.Categorical(values, categories=...)")
+        self.accountant.spend(self.dataset, epsilon, f"group_count({', '.join(columns)})")
+        categoricals = [self.data[col] for col in columns]
+        sizes = [len(cat.cat.categories) for cat in categoricals]
+
+        flat = np.zeros(len(self.data), dtype=np.int64)
+        valid = np.ones(len(self.data), dtype=bool)
+        for cat, size in zip(categoricals, sizes):
+            codes = cat.cat.codes.to_numpy()
+            valid &= codes >= 0
+            flat = flat * size + codes
+
+        exact = np.bincount(flat[valid], minlength=int(np.prod(sizes)))
+        noisy = np.maximum(self._laplace(exact.astype(np.float64), 1.0, epsilon), 0.0)
+        index = pd.MultiIndex.from_product([cat.cat.categories for cat in categoricals], names=columns)
+        return pd.Series(noisy, index=index, name='count')
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Offline Supabase Stand-in
+=========================
+A local, in-memory replacement for the `supabase` client used by the scripts,
+for benchmarks and for running the pipelines without network access.
+
+Tables are held column-wise in NumPy arrays sorted by (created_at, id), so the
+keyset pages requested by table_reader are located with a binary search
+instead of a scan, and millions of rows can be served quickly. Only the part
+of the PostgREST query builder the repo uses is implemented: select, the
+keyset `or_` filter, simple comparison filters, order, limit, range and
+execute, plus insert and rpc. The `table_summary` RPC from aggregates.py is
+registered by default.
+
+    supabase = FakeSupabase({'fable': survey_df, 'ocr': ocr_df})
+    read_table(supabase, 'fable')
+"""
+
+import asyncio
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import summarize_columns
+
+# The filter table_reader builds for "rows after (created_at, id)"
+_KEYSET = re.compile(r'^created_at\.gt\."(?P<ts>(?:[^"\\]|\\.)*)",and\(created_at\.eq\."(?:[^"\\]|\\.)*",id\.gt\.(?P<id>-?\d+)\)$')
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class FakeTable:
+    """One table, stored column-wise and sorted by (created_at, id)"""
+
+    def __init__(self, frame):
+        self.columns = {}
+        self.load(frame)
+
+    def load(self, frame):
+        frame = pd.DataFrame(frame)
+        if len(frame):
+            frame = frame.sort_values(['created_at', 'id'], kind='stable')
+        self.columns = {col: frame[col].to_numpy() for col in frame.columns}
+        if 'created_at' in self.columns:
+            self.columns['created_at'] = self.columns['created_at'].astype(str)
+
+    def __len__(self):
+        return len(self.columns.get('id', ()))
+
+    def position_after(self, created_at, row_id):
+        """Index of the first row strictly after the (created_at, id) key"""
+        created = self.columns['created_at']
+        lo = np.searchsorted(created, created_at, side='left')
+        hi = np.searchsorted(created, created_at, side='right')
+        return lo + int(np.searchsorted(self.columns['id'][lo:hi], row_id, side='right'))
+
+    def insert(self, rows):
+        existing = pd.DataFrame(self.columns)
+        self.load(pd.concat([existing, pd.DataFrame(rows)], ignore_index=True))
+
+class FakeQuery:
+    """Chainable subset of postgrest's request builder"""
+
+    _OPS = {'eq': np.equal, 'neq': np.not_equal, 'gt': np.greater,
+            'gte': np.greater_equal, 'lt': np.less, 'lte': np.less_equal}
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.table = client.tables[name]
+        self.selected = None
+        self.count_mode = None
+        self.after = None
+        self.filters = []
+        self.ordering = []
+        self.start = 0
+        self.stop = None
+        self.rows_to_insert = None
+
+    def select(self, columns='*', count=None):
+        self.selected = None if columns.strip() == '*' else [c.strip() for c in columns.split(',')]
+        self.count_mode = count
+        return self
+
+    def or_(self, filters):
+        match = _KEYSET.match(filters)
+        if not match:
+            raise NotImplementedError(f"FakeSupabase only supports keyset or_ filters, got {filters!r}")
+        ts = re.sub(r'\\(.)', r'\1', match.group('ts'))
+        self.after = (ts, int(match.group('id')))
+        return self
+
+    def _filter(self, op, column, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value): return self._filter('eq', column, value)
+    def neq(self, column, value): return self._filter('neq', column, value)
+    def gt(self, column, value): return self._filter('gt', column, value)
+    def gte(self, column, value): return self._filter('gte', column, value)
+    def lt(self, column, value): return self._filter('lt', column, value)
+    def lte(self, column, value): return self._filter('lte', column, value)
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self.stop = self.start + size
+        return self
+
+    def range(self, start, end):
+        self.start, self.stop = start, end + 1
+        return self
+
+    def insert(self, rows):
+        self.rows_to_insert = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def _indices(self):
+        table = self.table
+        begin = table.position_after(*self.after) if self.after else 0
+        indices = np.arange(begin, len(table))
+
+        for op, column, value in self.filters:
+            values = table.columns[column][indices]
+            if column == 'created_at':
+                value = str(value)
+            indices = indices[self._OPS[op](values, value)]
+
+        # Rows are stored in (created_at, id) order; anything else is sorted here
+        if self.ordering and [c for c, _ in self.ordering] != ['created_at', 'id'][:len(self.ordering)]:
+            keys = [table.columns[c][indices] for c, _ in reversed(self.ordering)]
+            indices = indices[np.lexsort(keys)]
+            if self.ordering[0][1]:
+                indices = indices[::-1]
+        elif self.ordering and self.ordering[0][1]:
+            indices = indices[::-1]
+
+        total = len(indices)
+        return indices[self.start:self.stop], total
+
+    def execute(self):
+        self.client._request()
+        return self._run()
+
+    def _run(self):
+        if self.rows_to_insert is not None:
+            self.table.insert(self.rows_to_insert)
+            return FakeResponse(self.rows_to_insert)
+
+        indices, total = self._indices()
+        columns = self.selected or list(self.table.columns)
+        values = [self.table.columns[col][indices].tolist() for col in columns]
+        data = [dict(zip(columns, row)) for row in zip(*values)]
+        self.client.rows_served += len(data)
+        return FakeResponse(data, count=total if self.count_mode else None)
+
+def _table_summary(client, table_name, length_column=None):
+    """In-memory equivalent of the table_summary Postgres function"""
+    table = client.tables[table_name]
+    created_at = table.columns.get('created_at', np.array([], dtype=object))
+    lengths = None
+    if length_column:
+        lengths = [len(v) for v in table.columns[length_column] if v is not None]
+    return summarize_columns(created_at, lengths)
+
+class FakeSupabase:
+    """
+    Drop-in for `create_client(...)` backed by in-memory tables
+
+    `latency` adds a fixed delay to every request to mimic a network round
+    trip. `requests` and `rows_served` count traffic for benchmarks.
+    """
+
+    def __init__(self, tables=None, latency=0.0):
+        self.tables = {name: FakeTable(frame) for name, frame in (tables or {}).items()}
+        self.latency = latency
+        self.functions = {'table_summary': _table_summary}
+        self.requests = 0
+        self.rows_served = 0
+
+    def _request(self):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = FakeTable(pd.DataFrame(columns=['id', 'created_at']))
+        return FakeQuery(self, name)
+
+    def rest_transport(self):
+        """
+        httpx transport answering PostgREST GET requests from these tables
+
+        Lets async_ingest run offline: `RestClient(url='http://fake', transport=...)`.
+        Latency is awaited, so concurrent requests overlap as they would over HTTP.
+        """
+        import httpx
+
+        async def handle(request):
+            self.requests += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            query = FakeQuery(self, request.url.path.rsplit('/', 1)[-1])
+            for name, value in request.url.params.multi_items():
+                if name == 'select':
+                    query.select(value)
+                elif name == 'order':
+                    for part in value.split(','):
+                        column, _, direction = part.partition('.')
+                        query.order(column, desc=direction == 'desc')
+                elif name == 'limit':
+                    query.limit(int(value))
+                elif name == 'or':
+                    query.or_(value[1:-1])
+                else:
+                    op, _, operand = value.partition('.')
+                    query._filter(op, name, int(operand) if name == 'id' else operand)
+            return httpx.Response(200, json=query._run().data)
+
+        return httpx.MockTransport(handle)
+
+    def register_function(self, name, function):
+        """Make `function(client, **params)` callable through rpc(name, params)"""
+        self.functions[name] = function
+
+    def rpc(self, name, params=None):
+        client = self
+
+        class _Call:
+            def execute(self):
+                client._request()
+                return FakeResponse(client.functions[name](client, **(params or {})))
+
+        return _Call()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Pipeline Instrumentation
+==================================
+Records, for every pipeline stage (fetch, decrypt, noise, features, ML,
+write, ...): calls, batches, rows, wall time, rows per second and the
+process's peak memory, and shows throttled progress instead of one line per
+batch or record.
+
+    with stage('dp.decrypt') as s:
+        answers = decrypt_survey_column(batch['hash_data'])
+        s.add(len(batch))
+    for batch in iterate('dp.fetch', source.iter_batches('fable')):
+        progress('dp', processed, unit='surveys')
+
+Metrics are off unless `configure(enabled=True)` is called or OBSCURA_METRICS
+names an export file. While off, `stage()` hands back one shared no-op
+context, `iterate()` returns the iterable itself and `record()` returns at
+once, so instrumented code pays a function call per stage. `export(path)` appends JSON lines (one record
+per stage) or, for a `.prom` path, writes a Prometheus textfile-collector
+file. With OBSCURA_METRICS set, metrics are exported when the process exits.
+
+Peak memory is the process's peak resident set size when the stage ended
+(a high-water mark, so it includes earlier stages); benchmark.py measures
+per-stage allocations with tracemalloc instead.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_PROGRESS_INTERVAL = 2.0
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.batches = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.peak_rss = None
+
+    def record(self):
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'batches': self.batches,
+            'rows': self.rows,
+            'seconds': round(self.seconds, 6),
+            'rows_per_second': round(self.rows / self.seconds, 1) if self.seconds > 0 else None,
+            'peak_rss_mb': round(self.peak_rss / 2**20, 3) if self.peak_rss is not None else None,
+        }
+
+class _Stage:
+    """One timed entry into a stage; `add` counts the rows it handled"""
+
+    __slots__ = ('owner', 'name', 'rows', 'batches', 'start')
+
+    def __init__(self, owner, name, rows, batches):
+        self.owner = owner
+        self.name = name
+        self.rows = rows
+        self.batches = batches
+
+    def add(self, rows, batches=1):
+        self.rows += rows
+        self.batches += batches
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.record(self.name, time.perf_counter() - self.start, self.rows, self.batches)
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def add(self, rows, batches=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class Instrumentation:
+    """Stage metrics of one process; thread-safe"""
+
+    def __init__(self, enabled=False, progress_interval=DEFAULT_PROGRESS_INTERVAL, stream=None):
+        self.enabled = enabled
+        self.progress_interval = progress_interval
+        self.stream = stream
+        self.run_id = uuid.uuid4().hex[:12]
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.last_progress = {}
+
+    def stage(self, name, rows=0, batches=0):
+        """Context manager timing one entry into `name`"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows, batches)
+
+    def record(self, name, seconds, rows, batches=1):
+        """Add work timed elsewhere, e.g. inside a pool worker"""
+        if not self.enabled:
+            return
+        peak = peak_rss_bytes()
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats(name)
+            stats.calls += 1
+            stats.batches += batches
+            stats.rows += rows
+            stats.seconds += seconds
+            stats.peak_rss = peak
+
+    def iterate(self, name, iterable, rows=len):
+        """Yield from `iterable`, timing each step as one batch of `rows(item)` rows"""
+        if not self.enabled:
+            return iterable
+        return self._timed(name, iterable, rows)
+
+    def _timed(self, name, iterable, rows):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - start, rows(item), 1)
+            yield item
+
+    def progress(self, name, done, total=None, unit='rows', force=False, file=None):
+        """Print `done` (of `total`) at most every progress_interval seconds per name"""
+        now = time.monotonic()
+        if not force and now - self.last_progress.get(name, -self.progress_interval) < self.progress_interval:
+            return
+        self.last_progress[name] = now
+        of_total = f"/{total}" if total is not None else ""
+        print(f"   {name}: {done}{of_total} {unit}", file=file or self.stream or sys.stdout, flush=True)
+
+    def records(self):
+        timestamp = datetime.now(timezone.utc).isoformat()
+        with self.lock:
+            return [{'run_id': self.run_id, 'timestamp': timestamp, **stats.record()}
+                    for stats in self.stages.values()]
+
+    def write_jsonl(self, path):
+        with open(path, 'a') as f:
+            for record in self.records():
+                f.write(json.dumps(record) + '\n')
+
+    def write_prometheus(self, path):
+        """Prometheus text exposition format, replaced atomically for the textfile collector"""
+        metrics = [
+            ('calls_total', 'counter', 'Entries into each pipeline stage', 'calls'),
+            ('batches_total', 'counter', 'Batches processed by each pipeline stage', 'batches'),
+            ('rows_total', 'counter', 'Rows processed by each pipeline stage', 'rows'),
+            ('seconds_total', 'counter', 'Wall time spent in each pipeline stage', 'seconds'),
+            ('rows_per_second', 'gauge', 'Throughput of each pipeline stage', 'rows_per_second'),
+            ('peak_rss_megabytes', 'gauge', 'Process peak resident memory after each stage', 'peak_rss_mb'),
+        ]
+        records = self.records()
+        lines = []
+        for suffix, kind, description, key in metrics:
+            name = f'obscura_stage_{suffix}'
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+            lines += [f'{name}{{stage="{record["stage"]}"}} {record[key]}'
+                      for record in records if record[key] is not None]
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_file, path)
+
+    def export(self, path):
+        if path.endswith('.prom'):
+            self.write_prometheus(path)
+        else:
+            self.write_jsonl(path)
+        return path
+
+    def summary(self):
+        """Printable table of every stage"""
+        lines = [f"   {'stage':<32} {'seconds':>9} {'rows':>11} {'rows/s':>13} {'batches':>8} {'peak MB':>9}"]
+        for record in self.records():
+            peak = f"{record['peak_rss_mb']:9.1f}" if record['peak_rss_mb'] is not None else f"{'-':>9}"
+            lines.append(f"   {record['stage']:<32} {record['seconds']:9.3f} {record['rows']:>11,} "
+                         f"{record['rows_per_second'] or 0:>13,.0f} {record['batches']:>8} {peak}")
+        return '\n'.join(lines)
+
+metrics = Instrumentation(enabled=bool(os.environ.get('OBSCURA_METRICS')))
+
+def configure(enabled=True, progress_interval=None):
+    metrics.enabled = enabled
+    if progress_interval is not None:
+        metrics.progress_interval = progress_interval
+    return metrics
+
+def stage(name, rows=0, batches=0):
+    return metrics.stage(name, rows, batches)
+
+def iterate(name, iterable, rows=len):
+    return metrics.iterate(name, iterable, rows)
+
+def progress(name, done, total=None, unit='rows', force=False, file=None):
+    metrics.progress(name, done, total, unit, force, file)
+
+def export(path):
+    return metrics.export(path)
+
+def _export_at_exit():
+    path = os.environ.get('OBSCURA_METRICS')
+    if path and metrics.stages:
+        metrics.export(path)
+
+atexit.register(_export_at_exit)
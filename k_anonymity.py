@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+k-Anonymity for Released Datasets
+=================================
+Checks and enforces that every combination of quasi-identifiers (age, gender,
+location, answer bands, ...) in a released table is shared by at least k
+rows, so no row can be singled out by those columns.
+
+- `class_sizes` / `achieved_k`: equivalence classes are numbered with one
+  grouped factorization and counted with a bincount.
+- `suppress`: drops the rows of classes smaller than k.
+- `mondrian`: multidimensional Mondrian partitioning. Quasi-identifiers are
+  turned into numeric codes (categories in their order), and every round
+  splits all splittable partitions at once: one lexsort groups the rows by
+  partition and by the widest (normalized) dimension, the lower half by rank
+  keeps the label and the upper half gets a new one. Partitions stop at fewer
+  than 2k rows, so each final partition has k..2k-1 rows (more when all its
+  values are equal), and there are about log2(n / k) rounds. Values are then
+  replaced by their partition's range, e.g. age `30-34` or gender
+  `Female-Male`.
+
+    released, report = enforce_k_anonymity(df, ['Age', 'Gender', 'Location'], k=5)
+    # report == {'k': 5, 'achieved_k': 5, 'rows': ..., 'partitions': ..., 'suppressed': 0}
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 5
+
+def class_sizes(frame, quasi_identifiers):
+    """Size of each row's equivalence class over `quasi_identifiers`"""
+    if not len(frame):
+        return np.zeros(0, dtype=np.int64)
+    classes = frame.groupby(list(quasi_identifiers), sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    return np.bincount(classes)[classes]
+
+def achieved_k(frame, quasi_identifiers):
+    """Smallest equivalence class (0 for an empty frame)"""
+    sizes = class_sizes(frame, quasi_identifiers)
+    return int(sizes.min()) if len(sizes) else 0
+
+def suppress(frame, quasi_identifiers, k=DEFAULT_K):
+    """Drop the rows whose equivalence class has fewer than k rows; returns (kept rows, dropped count)"""
+    keep = class_sizes(frame, quasi_identifiers) >= k
+    return frame[keep], int((~keep).sum())
+
+def _codes(values):
+    """Numeric codes of one column and a function turning a code range into a label"""
+    if pd.api.types.is_numeric_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype):
+        numbers = values.to_numpy(dtype=np.float64)
+        return numbers, lambda lo, hi: f'{lo:g}' if lo == hi else f'{lo:g}-{hi:g}'
+    categorical = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype(str).astype('category')
+    categories = np.asarray(categorical.cat.categories.astype(str), dtype=object)
+    codes = categorical.cat.codes.to_numpy().astype(np.float64)
+    return codes, lambda lo, hi: categories[int(lo)] if lo == hi else f'{categories[int(lo)]}-{categories[int(hi)]}'
+
+def mondrian_partitions(values, k=DEFAULT_K):
+    """
+    Mondrian partition label of every row of a (rows x dimensions) array
+
+    NaN is not supported; fill or drop missing quasi-identifiers first.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    labels = np.zeros(n, dtype=np.int64)
+    if n < 2 * k:
+        return labels
+
+    lower = values.min(axis=0)
+    span = values.max(axis=0) - lower
+    scaled = (values - lower) / np.where(span > 0, span, 1.0)
+
+    active = np.arange(n)
+    next_label = 1
+    while len(active):
+        rows = active[np.argsort(labels[active], kind='stable')]
+        part = labels[rows]
+        starts = np.flatnonzero(np.r_[True, part[1:] != part[:-1]])
+        sizes = np.diff(np.r_[starts, len(rows)])
+        group = np.repeat(np.arange(len(starts)), sizes)
+
+        x = scaled[rows]
+        widths = np.maximum.reduceat(x, starts) - np.minimum.reduceat(x, starts)
+        dimension = widths.argmax(axis=1)
+        splittable = (sizes >= 2 * k) & (widths.max(axis=1) > 0)
+
+        # Order each partition by its widest dimension; blocks stay where they are
+        order = np.lexsort((x[np.arange(len(rows)), dimension[group]], group))
+        rows = rows[order]
+        rank = np.arange(len(rows)) - starts[group]
+        upper = splittable[group] & (rank >= sizes[group] // 2)
+
+        new_labels = next_label + np.cumsum(splittable) - 1
+        labels[rows[upper]] = new_labels[group[upper]]
+        next_label += int(splittable.sum())
+        active = rows[splittable[group]]
+    return labels
+
+def mondrian(frame, quasi_identifiers, k=DEFAULT_K):
+    """
+    Copy of `frame` with each quasi-identifier generalized to the range of its
+    Mondrian partition; returns (generalized frame, partition labels)
+    """
+    if not len(frame) or not quasi_identifiers:
+        return frame.copy(), np.zeros(len(frame), dtype=np.int64)
+    columns = [_codes(frame[col]) for col in quasi_identifiers]
+    labels = mondrian_partitions(np.column_stack([codes for codes, _ in columns]), k)
+
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    # Dense 0..p-1 partition index per row
+    partition = np.empty(len(frame), dtype=np.int64)
+    partition[order] = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(frame)]))
+
+    generalized = frame.copy()
+    for col, (codes, label) in zip(quasi_identifiers, columns):
+        ordered = codes[order]
+        lows, highs = np.minimum.reduceat(ordered, starts), np.maximum.reduceat(ordered, starts)
+        names = np.array([label(lo, hi) for lo, hi in zip(lows, highs)], dtype=object)
+        generalized[col] = names[partition]
+    return generalized, partition
+
+def enforce_k_anonymity(frame, quasi_identifiers, k=DEFAULT_K):
+    """
+    Mondrian-generalize `quasi_identifiers`, then suppress any class still
+    below k (only possible when the table has fewer than k rows)
+    """
+    complete = frame.dropna(subset=list(quasi_identifiers))
+    generalized, partition = mondrian(complete, quasi_identifiers, k)
+    released, suppressed = suppress(generalized, quasi_identifiers, k)
+    report = {
+        'k': k,
+        'achieved_k': achieved_k(released, quasi_identifiers),
+        'rows': len(released),
+        'partitions': int(partition.max()) + 1 if len(partition) else 0,
+        'suppressed': suppressed + len(frame) - len(complete),
+    }
+    return released, report
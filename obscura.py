@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Obscura Command Line
+====================
+One entry point for the data-science scripts:
+
+    python obscura.py view [--summary [--sync]] [--offline]
+    python obscura.py analyze [--watch]
+    python obscura.py dp [--incremental]
+    python obscura.py anonymize survey.csv -o private.parquet --columns age
+    python obscura.py synthesize survey -n 100k -o survey.parquet
+    python obscura.py synthesize --ctgan dataset/customer_churn.csv -n 10m -o churn.parquet
+    python obscura.py evaluate dataset/customer_churn.csv churn.parquet --target Churn
+    python obscura.py redact -o ocr_redacted.parquet
+    python obscura.py kanon export.csv -o release.parquet --qi Age Gender Location -k 5
+    python obscura.py score customers.csv -o scores.parquet
+    python obscura.py --metrics dp_metrics.prom dp
+    python obscura.py --metrics=anonymize_metrics.jsonl anonymize big.csv -o private.parquet
+
+--metrics FILE records wall time, rows/s, peak memory and batch counts of
+every instrumented stage (instrumentation.py), prints them and exports them
+as JSON lines, or as a Prometheus textfile for a .prom FILE.
+
+Each subcommand imports its script only when it runs, so pandas, numpy,
+matplotlib and the crypto libraries are loaded only by the commands that use
+them. `view --summary` reads the local replica's aggregates without touching
+the network and needs none of them; it syncs first only with --sync, or when
+there is no replica yet. Plain `view` connects to Supabase and syncs the
+replica unless --offline. Connection settings come from config.py.
+"""
+
+import argparse
+import os
+import sys
+
+from config import DEFAULT_REPLICA_FILE
+
+SYNTHETIC_TABLES = ('survey', 'ocr', 'churn')
+
+def _replica_file(args):
+    return None if args.no_replica else args.replica
+
+def _open_source(args, offline=None):
+    """The replica (synced unless offline) or Supabase itself with --no-replica"""
+    if args.offline if offline is None else offline:
+        from replica import LocalReplica
+        return LocalReplica(args.replica)
+
+    from config import get_client
+    from replica import open_replica
+    supabase = get_client()
+    replica_file = _replica_file(args)
+    return open_replica(supabase, replica_file) if replica_file else supabase
+
+def view(args):
+    import simple_data_viewer as viewer
+
+    if not args.summary and not args.offline:
+        viewer.main(replica_file=_replica_file(args))
+        return
+
+    # A summary answers from the replica already on disk unless asked to sync
+    offline = args.offline or (args.summary and not args.sync and not args.no_replica
+                               and os.path.exists(args.replica))
+    source = _open_source(args, offline)
+    if not args.summary:
+        viewer.show_your_survey_data(source)
+        viewer.show_your_ocr_data(source)
+    viewer.show_simple_summary(source)
+
+def analyze(args):
+    import live_data_analysis as live
+
+    if args.watch:
+        live.watch(live.setup_supabase(), _replica_file(args), args.interval)
+    else:
+        live.main(replica_file=_replica_file(args))
+
+def dp(args):
+    import differential_privacy_pipeline as pipeline
+    pipeline.main(incremental=args.incremental, replica_file=_replica_file(args), seed=args.seed)
+
+def anonymize(args):
+    import anonymize as anonymizer
+    anonymizer.main(args.args)
+
+def synthesize(args):
+    if args.ctgan:
+        import pandas as pd
+        from synthesizer import CTGANSynthesizer
+
+        synthesizer = CTGANSynthesizer(epochs=args.epochs, threads=args.threads,
+                                       seed=args.seed or 0, verbose=True)
+        real = pd.read_csv(args.ctgan)
+        synthesizer.fit(real)
+        rows = synthesizer.write(args.rows, args.output)
+        print(f"💾 Wrote {rows} CTGAN rows learned from {args.ctgan} to {args.output}", file=sys.stderr)
+        if args.evaluate:
+            from fidelity import DEFAULT_MAX_ROWS, evaluate, print_report
+            sample = next(synthesizer.sample(min(rows, DEFAULT_MAX_ROWS), chunk_size=DEFAULT_MAX_ROWS))
+            print_report(evaluate(real, sample, target=args.target))
+        return
+
+    import synthetic_data
+    from storage import write_chunks
+
+    generate = {
+        'survey': synthetic_data.iter_survey_frames,
+        'ocr': synthetic_data.iter_ocr_frames,
+        'churn': synthetic_data.iter_churn_frames,
+    }[args.table]
+    frames = generate(args.rows) if args.seed is None else generate(args.rows, seed=args.seed)
+    rows = write_chunks(frames, args.output)
+    print(f"💾 Wrote {rows} synthetic {args.table} rows to {args.output}", file=sys.stderr)
+
+def evaluate(args):
+    from fidelity import evaluate as measure, load_table, print_report
+    report = measure(load_table(args.real), load_table(args.synthetic), target=args.target,
+                     max_rows=args.max_rows)
+    print_report(report)
+
+def score(args):
+    import json
+    import queue
+    import threading
+    from concurrent.futures import Future
+    from churn_scoring import DEFAULT_MAX_BATCH, ChurnScorer, MicroBatcher, score_file
+
+    scorer = ChurnScorer.load(args.model, args.preprocessor, threshold=args.threshold)
+    if args.input:
+        metrics = score_file(scorer, args.input, args.output)
+        print(f"💾 Scored {metrics['rows']} customers into {args.output} "
+              f"({metrics['rows_per_second']:,.0f} rows/s)", file=sys.stderr)
+        return
+
+    # One JSON customer per line in, one JSON score per line out, in input order.
+    # Lines are submitted as soon as they are read and answered by a printer
+    # thread, so lines arriving together are scored as one micro-batch.
+    # Bounded, so a fast producer waits for the scorer instead of queueing all of stdin
+    pending = queue.Queue(maxsize=4 * DEFAULT_MAX_BATCH)
+
+    def answer():
+        while True:
+            future = pending.get()
+            if future is None:
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'error': str(e)}
+            print(json.dumps(result, default=float), flush=True)
+
+    with MicroBatcher(scorer) as batcher:
+        printer = threading.Thread(target=answer, name='score-printer', daemon=True)
+        printer.start()
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                customer = json.loads(line)
+                if not isinstance(customer, dict):
+                    raise ValueError("expected a JSON object per line")
+            except ValueError as e:
+                # Answered with an error line in its place, without failing the micro-batch
+                future = Future()
+                future.set_exception(e)
+            else:
+                future = batcher.submit(customer)
+            pending.put(future)
+        pending.put(None)
+        printer.join()
+    print(json.dumps(scorer.metrics.summary()), file=sys.stderr)
+
+def redact(args):
+    from collections import Counter
+    from pii_redaction import PII_TYPES, redact_frames
+    from storage import write_chunks
+    from table_reader import as_source
+
+    batches = as_source(_open_source(args)).iter_batches('ocr')
+    counts = Counter()
+
+    def frames():
+        for frame, part in redact_frames(batches, workers=args.workers):
+            counts.update(part)
+            yield frame
+
+    rows = write_chunks(frames(), args.output)
+    print(f"💾 Wrote {rows} redacted OCR texts to {args.output}", file=sys.stderr)
+    for kind in PII_TYPES:
+        print(f"   {kind}: {counts[kind]}", file=sys.stderr)
+
+def kanon(args):
+    import pandas as pd
+    from k_anonymity import enforce_k_anonymity
+    from storage import read_frame, write_frame
+
+    frame = pd.read_csv(args.input) if args.input.endswith('.csv') else read_frame(args.input)
+    released, report = enforce_k_anonymity(frame, args.quasi_identifiers, args.k)
+    if args.output.endswith('.csv'):
+        released.to_csv(args.output, index=False)
+    else:
+        write_frame(released, args.output)
+    print(f"💾 Wrote {report['rows']} rows to {args.output}: k={report['achieved_k']} over "
+          f"{', '.join(args.quasi_identifiers)}, {report['partitions']} partitions, "
+          f"{report['suppressed']} rows suppressed", file=sys.stderr)
+
+def _scale(text):
+    from synthetic_data import parse_scale
+    return parse_scale(text)
+
+def _add_replica_options(parser):
+    parser.add_argument('--replica', default=DEFAULT_REPLICA_FILE,
+                        help=f"local replica to sync and read from (default {DEFAULT_REPLICA_FILE})")
+    parser.add_argument('--no-replica', action='store_true', help="read every row from Supabase instead")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='obscura', description="Obscura privacy-preserving data tools")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="export per-stage metrics to FILE (.jsonl, or .prom for Prometheus)")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    command = commands.add_parser('view', help="show the data submitted through the mobile app")
+    command.add_argument('--summary', action='store_true',
+                         help="only print counts and activity from the local replica, without syncing")
+    command.add_argument('--sync', action='store_true', help="with --summary, sync the replica first")
+    command.add_argument('--offline', action='store_true', help="read the local replica without syncing")
+    _add_replica_options(command)
+    command.set_defaults(run=view)
+
+    command = commands.add_parser('analyze', help="live analysis, dashboard and clustering")
+    command.add_argument('--watch', action='store_true', help="keep running and update rolling aggregates")
+    command.add_argument('--interval', type=float, default=5.0, help="seconds between polls in --watch mode")
+    _add_replica_options(command)
+    command.set_defaults(run=analyze)
+
+    command = commands.add_parser('dp', help="differential privacy pipeline")
+    command.add_argument('--incremental', action='store_true', help="only process surveys since the last run")
+    command.add_argument('--seed', type=int, help="root noise seed, to regenerate an earlier release")
+    _add_replica_options(command)
+    command.set_defaults(run=dp)
+
+    # Listed for --help; main() passes its arguments straight to anonymize.py
+    commands.add_parser('anonymize', help="noise columns of large CSV files", add_help=False)
+
+    command = commands.add_parser('synthesize', help="generate synthetic datasets")
+    command.add_argument('table', nargs='?', choices=SYNTHETIC_TABLES, help="rule-based generator to use")
+    command.add_argument('--ctgan', metavar='CSV', help="learn the data from CSV with CTGAN instead (cached model)")
+    command.add_argument('--epochs', type=int, default=200, help="CTGAN training epochs (default 200)")
+    command.add_argument('--threads', type=int, help="CPU threads for CTGAN (default: torch's)")
+    command.add_argument('-n', '--rows', type=_scale, default=10_000, help="rows to generate, e.g. 5000, 100k, 1m (default 10k)")
+    command.add_argument('-o', '--output', required=True, help="output .csv or .parquet file")
+    command.add_argument('--seed', type=int, help="random seed (default: fixed per table)")
+    command.add_argument('--evaluate', action='store_true', help="report fidelity to the CSV after --ctgan")
+    command.add_argument('--target', help="column to predict in the fidelity utility score, e.g. Churn")
+    command.set_defaults(run=synthesize)
+
+    command = commands.add_parser('evaluate', help="measure how closely synthetic data follows real data")
+    command.add_argument('real', help="real .csv or Parquet file")
+    command.add_argument('synthetic', help="synthetic .csv or Parquet file")
+    command.add_argument('--target', help="column to predict for the train-on-synthetic score, e.g. Churn")
+    command.add_argument('--max-rows', type=_scale, default=100_000, help="rows sampled from each table (default 100k)")
+    command.set_defaults(run=evaluate)
+
+    command = commands.add_parser('redact', help="decrypt OCR texts and redact personal data")
+    command.add_argument('-o', '--output', default='ocr_redacted.parquet',
+                         help="output .csv or .parquet file (default ocr_redacted.parquet)")
+    command.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    command.add_argument('--offline', action='store_true', help="read the local replica without syncing")
+    _add_replica_options(command)
+    command.set_defaults(run=redact)
+
+    command = commands.add_parser('kanon', help="generalize quasi-identifiers until every row has k look-alikes")
+    command.add_argument('input', help="input .csv or Parquet file")
+    command.add_argument('-o', '--output', required=True, help="output .csv or .parquet file")
+    command.add_argument('--quasi-identifiers', '--qi', nargs='+', required=True,
+                         help="columns an attacker could link on, e.g. Age Gender Location")
+    command.add_argument('-k', type=int, default=5, help="minimum equivalence class size (default 5)")
+    command.set_defaults(run=kanon)
+
+    command = commands.add_parser('score', help="score customers with the churn model")
+    command.add_argument('input', nargs='?', help="customer CSV to score (default: JSON lines on stdin)")
+    command.add_argument('-o', '--output', help="output .csv or .parquet file for INPUT")
+    command.add_argument('--model', default='churn_model.keras', help="saved churn model (default churn_model.keras)")
+    command.add_argument('--preprocessor', default='churn_preprocessor.joblib',
+                         help="fitted ChurnPreprocessor (default churn_preprocessor.joblib)")
+    command.add_argument('--threshold', type=float, default=0.5, help="churn probability cut-off (default 0.5)")
+    command.set_defaults(run=score)
+
+    return parser
+
+def _global_parser():
+    """Global options and the command; everything after the command is left unparsed"""
+    parser = argparse.ArgumentParser(prog='obscura', add_help=False, allow_abbrev=False)
+    parser.add_argument('--metrics')
+    parser.add_argument('command', nargs='?')
+    parser.add_argument('rest', nargs=argparse.REMAINDER)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Hand everything after `anonymize` over untouched, including --help
+    options, _ = _global_parser().parse_known_args(argv)
+    if options.command == 'anonymize':
+        args = argparse.Namespace(args=options.rest, run=anonymize, metrics=options.metrics)
+    else:
+        parser = build_parser()
+        args = parser.parse_args(argv)
+        if args.command == 'synthesize' and (args.table is None) == (args.ctgan is None):
+            parser.error("synthesize needs either a table or --ctgan CSV")
+        if args.command == 'score' and args.input and not args.output:
+            parser.error("score INPUT needs -o OUTPUT")
+    if not args.metrics:
+        args.run(args)
+        return
+
+    from instrumentation import configure
+    metrics = configure(enabled=True)
+    try:
+        args.run(args)
+    finally:
+        if metrics.stages:
+            print(f"\n📈 Stage metrics:\n{metrics.summary()}", file=sys.stderr)
+            print(f"💾 Exported stage metrics to {metrics.export(args.metrics)}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
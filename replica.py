@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Local Replica Store - Sync Supabase Tables to Disk Once
+=======================================================
+Keeps an on-disk SQLite copy of the `fable` and `ocr` tables so the analysis
+scripts stop downloading the whole database on every run.
+
+`sync` asks Supabase only for rows after the replica's high-water mark, the
+newest (created_at, id) key it already holds, using the same keyset pages as
+table_reader. Every page is committed as it arrives, so an interrupted sync
+resumes where it stopped. Reads are local and offer the same data-source
+interface as table_reader.SupabaseSource, including `summarize` (see
+aggregates.py):
+
+    replica = LocalReplica().sync(supabase)
+    survey_data = replica.read('fable')
+    for page in replica.iter_pages('ocr', columns=['created_at']):
+        ...
+"""
+
+import sqlite3
+
+from aggregates import LENGTH_COLUMNS
+from config import DEFAULT_REPLICA_FILE
+from table_reader import DEFAULT_BATCH_SIZE, TABLE_COLUMNS, iter_table_pages
+
+
+# SQLite column types of the replicated columns
+_COLUMN_TYPES = {'id': 'INTEGER PRIMARY KEY', 'created_at': 'TEXT NOT NULL'}
+
+def _quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+class LocalReplica:
+    """SQLite replica of the app tables, read through the data-source interface"""
+
+    def __init__(self, path=DEFAULT_REPLICA_FILE, tables=tuple(TABLE_COLUMNS)):
+        self.path = path
+        self.tables = list(tables)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        for table in self.tables:
+            self._create(table)
+
+    def _create(self, table):
+        columns = ', '.join(f"{_quote_identifier(col)} {_COLUMN_TYPES.get(col, 'TEXT')}"
+                            for col in self._columns(table))
+        name = _quote_identifier(table)
+        with self.connection:
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS {name} ({columns})')
+            self.connection.execute(f'CREATE INDEX IF NOT EXISTS {_quote_identifier(table + "_key")} '
+                                    f'ON {name} (created_at, id)')
+
+    def _columns(self, table):
+        if table not in TABLE_COLUMNS:
+            raise KeyError(f"'{table}' is not a replicated table")
+        return TABLE_COLUMNS[table]
+
+    def _select(self, table, columns):
+        columns = list(columns or self._columns(table))
+        unknown = set(columns) - set(self._columns(table))
+        if unknown:
+            raise KeyError(f"'{table}' has no column(s) {', '.join(sorted(unknown))}")
+        return columns, ', '.join(map(_quote_identifier, columns))
+
+    def high_water_mark(self, table):
+        """(created_at, id) of the newest replicated row, or None if empty"""
+        return self.connection.execute(
+            f'SELECT created_at, id FROM {_quote_identifier(table)} ORDER BY created_at DESC, id DESC LIMIT 1'
+        ).fetchone()
+
+    def count(self, table):
+        return self.connection.execute(f'SELECT COUNT(*) FROM {_quote_identifier(table)}').fetchone()[0]
+
+    def sync(self, supabase, tables=None, batch_size=DEFAULT_BATCH_SIZE, verbose=True):
+        """
+        Pull rows newer than the high-water mark of each table
+
+        Returns the replica so calls chain: `LocalReplica().sync(supabase)`.
+        """
+        for table in tables or self.tables:
+            columns, column_list = self._select(table, None)
+            insert = (f'INSERT OR REPLACE INTO {_quote_identifier(table)} ({column_list}) '
+                      f'VALUES ({", ".join("?" * len(columns))})')
+            added = 0
+            for rows in iter_table_pages(supabase, table, columns, batch_size, after=self.high_water_mark(table)):
+                with self.connection:
+                    self.connection.executemany(insert, [tuple(row.get(col) for col in columns) for row in rows])
+                added += len(rows)
+            if verbose:
+                print(f"🔄 Synced '{table}': {added} new rows, {self.count(table)} stored locally")
+        return self
+
+    def iter_pages(self, table, columns=None, batch_size=DEFAULT_BATCH_SIZE, after=None):
+        """Yield pages (lists of row dicts) ordered by (created_at, id), as table_reader does"""
+        columns, column_list = self._select(table, columns)
+        query = f'SELECT {column_list} FROM {_quote_identifier(table)}'
+        params = ()
+        if after is not None:
+            query += ' WHERE created_at > ? OR (created_at = ? AND id > ?)'
+            params = (after[0], after[0], int(after[1]))
+        cursor = self.connection.execute(query + ' ORDER BY created_at, id', params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield [dict(zip(columns, row)) for row in rows]
+
+    def iter_batches(self, table, columns=None, batch_size=DEFAULT_BATCH_SIZE, after=None):
+        """Yield DataFrame batches ordered by (created_at, id)"""
+        import pandas as pd
+
+        for rows in self.iter_pages(table, columns, batch_size, after):
+            yield pd.DataFrame.from_records(rows)
+
+    def read(self, table, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        """Read a whole replicated table into one DataFrame"""
+        import pandas as pd
+
+        columns, column_list = self._select(table, columns)
+        return pd.read_sql_query(f'SELECT {column_list} FROM {_quote_identifier(table)} ORDER BY created_at, id',
+                                 self.connection)
+
+    def read_many(self, tables, batch_size=DEFAULT_BATCH_SIZE):
+        """Read several replicated tables into {table: DataFrame}"""
+        return {table: self.read(table, batch_size=batch_size) for table in tables}
+
+    def summarize(self, table):
+        """Counts, hour/day histograms and length statistics, computed in SQLite"""
+        name = _quote_identifier(table)
+        length_column = LENGTH_COLUMNS.get(table)
+        rows, first, last = self.connection.execute(
+            f'SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM {name}').fetchone()
+        hourly = self.connection.execute(
+            f'SELECT CAST(substr(created_at, 12, 2) AS INTEGER), COUNT(*) FROM {name} GROUP BY 1 ORDER BY 1').fetchall()
+        daily = self.connection.execute(
+            f'SELECT substr(created_at, 1, 10), COUNT(*) FROM {name} GROUP BY 1 ORDER BY 1').fetchall()
+
+        length = None
+        if length_column:
+            column = _quote_identifier(length_column)
+            mean, lowest, highest = self.connection.execute(
+                f'SELECT AVG(LENGTH({column})), MIN(LENGTH({column})), MAX(LENGTH({column})) FROM {name}').fetchone()
+            length = {'mean': mean, 'min': lowest, 'max': highest}
+
+        return {'rows': rows, 'first': first, 'last': last,
+                'hourly': dict(hourly), 'daily': dict(daily), 'length': length}
+
+    def close(self):
+        self.connection.close()
+
+def open_replica(supabase, path=DEFAULT_REPLICA_FILE):
+    """Open the replica at `path` and bring it up to date with Supabase"""
+    return LocalReplica(path).sync(supabase)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Incremental Rolling Aggregates for Live Analysis
+================================================
+Keeps the live dashboard's numbers (row counts, submissions per hour and per
+day, the cumulative growth curve and ciphertext length statistics) up to date
+without recomputing them from the full tables.
+
+Each poll reads only the rows after the per-table (created_at, id)
+watermark, so an update costs O(new rows). The counters and watermarks are
+saved to a JSON state file after every poll, so a restarted daemon carries on
+where it stopped instead of rescanning history.
+
+`summary(table)` returns the same dict as `source.summarize(table)` (see
+aggregates.py), so generate_insights works on either.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from aggregates import LENGTH_COLUMNS
+from table_reader import DEFAULT_BATCH_SIZE, as_source
+
+DEFAULT_STATE_FILE = 'live_analysis_state.json'
+
+def _empty():
+    return {
+        'watermark': None,
+        'rows': 0,
+        'first': None,
+        'last': None,
+        'hourly': {},
+        'daily': {},
+        'length': {'count': 0, 'total': 0, 'min': None, 'max': None},
+    }
+
+class RollingAggregates:
+    """Per-table counters that are updated from new rows only"""
+
+    def __init__(self, tables=tuple(LENGTH_COLUMNS)):
+        self.tables = {table: _empty() for table in tables}
+
+    def update(self, table, rows):
+        """Fold a page of row dicts, in (created_at, id) order, into the counters"""
+        if not rows:
+            return 0
+        state = self.tables[table]
+        hourly, daily, length = state['hourly'], state['daily'], state['length']
+        length_column = LENGTH_COLUMNS.get(table)
+
+        for row in rows:
+            timestamp = row['created_at']
+            hour = int(timestamp[11:13])
+            hourly[hour] = hourly.get(hour, 0) + 1
+            daily[timestamp[:10]] = daily.get(timestamp[:10], 0) + 1
+            if length_column and row.get(length_column) is not None:
+                size = len(row[length_column])
+                length['count'] += 1
+                length['total'] += size
+                length['min'] = size if length['min'] is None else min(length['min'], size)
+                length['max'] = size if length['max'] is None else max(length['max'], size)
+
+        state['rows'] += len(rows)
+        state['first'] = state['first'] or rows[0]['created_at']
+        state['last'] = rows[-1]['created_at']
+        state['watermark'] = [rows[-1]['created_at'], rows[-1]['id']]
+        return len(rows)
+
+    def poll(self, source, batch_size=DEFAULT_BATCH_SIZE):
+        """Read rows after each table's watermark; returns new rows per table"""
+        source = as_source(source)
+        added = {}
+        for table, state in self.tables.items():
+            columns = ['id', 'created_at'] + ([LENGTH_COLUMNS[table]] if table in LENGTH_COLUMNS else [])
+            after = tuple(state['watermark']) if state['watermark'] else None
+            added[table] = sum(self.update(table, page)
+                               for page in source.iter_pages(table, columns, batch_size, after=after))
+        return added
+
+    def summary(self, table):
+        """Current aggregates in the aggregates.py summary shape"""
+        state = self.tables[table]
+        length = state['length']
+        return {
+            'rows': state['rows'],
+            'first': state['first'],
+            'last': state['last'],
+            'hourly': dict(sorted(state['hourly'].items())),
+            'daily': dict(sorted(state['daily'].items())),
+            'length': {
+                'mean': length['total'] / length['count'] if length['count'] else None,
+                'min': length['min'],
+                'max': length['max'],
+            } if table in LENGTH_COLUMNS else None,
+        }
+
+    def cumulative(self, table):
+        """Cumulative submissions at the end of each day, as a Series"""
+        daily = pd.Series(self.summary(table)['daily'], dtype='int64')
+        daily.index = pd.to_datetime(daily.index)
+        return daily.cumsum()
+
+    def save(self, state_file=DEFAULT_STATE_FILE):
+        """Atomically write counters and watermarks"""
+        tmp_file = state_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'updated_at': pd.Timestamp.now(tz='UTC').isoformat(), 'tables': self.tables}, f, indent=2)
+        os.replace(tmp_file, state_file)
+
+    @classmethod
+    def load(cls, state_file=DEFAULT_STATE_FILE, tables=tuple(LENGTH_COLUMNS)):
+        """Restore saved counters, or start empty if there is no state file"""
+        aggregates = cls(tables)
+        if os.path.exists(state_file):
+            with open(state_file) as f:
+                saved = json.load(f)['tables']
+            for table, state in saved.items():
+                # JSON object keys are strings; hours are counted as ints
+                state['hourly'] = {int(h): n for h, n in state['hourly'].items()}
+                aggregates.tables[table] = state
+        return aggregates
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Columnar Storage for Pipeline Artifacts
+=======================================
+Writes pipeline outputs as typed, compressed Parquet (or Arrow IPC) instead of
+CSV, and reads them back memory-mapped and column by column.
+
+- Dtypes survive the round trip: ordered categoricals such as `amount_group`
+  come back as categoricals, timestamps as timestamps, no re-parsing of text.
+- Datasets that grow over time are hive-partitioned by date
+  (`<root>/date=YYYY-MM-DD/part-*.parquet`) so readers can skip partitions.
+- `.arrow` files are uncompressed Arrow IPC, which maps straight into memory
+  without a decode step; `.parquet` files are zstd-compressed for size.
+"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+DEFAULT_COMPRESSION = 'zstd'
+
+def _to_arrow(df):
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def write_frame(df, path, compression=DEFAULT_COMPRESSION):
+    """
+    Write one DataFrame to `path` as Parquet, or as Arrow IPC for `.arrow`
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    table = _to_arrow(df)
+    if path.endswith(('.arrow', '.feather')):
+        with pa.OSFile(path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, path, compression=compression)
+    return path
+
+def read_frame(path, columns=None):
+    """
+    Memory-map an artifact written by write_frame and read only `columns`
+    """
+    if path.endswith(('.arrow', '.feather')):
+        with pa.memory_map(path, 'r') as source:
+            table = ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+def _conform(table, schema, path):
+    """`table` cast to `schema` where that loses nothing, or a ValueError naming the column"""
+    if table.schema.equals(schema):
+        return table
+    missing = [name for name in schema.names if name not in table.column_names]
+    unexpected = [name for name in table.column_names if name not in schema.names]
+    if missing or unexpected:
+        raise ValueError(f"chunk columns do not match {path}: missing {missing}, unexpected {unexpected}")
+
+    columns = []
+    for field in schema:
+        column = table.column(field.name)
+        if not column.type.equals(field.type):
+            try:
+                column = column.cast(field.type, safe=True)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(f"column '{field.name}' is {column.type} in this chunk but {field.type} in "
+                                 f"{path}; read it with a fixed dtype or declare the schema") from e
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+class ParquetSink:
+    """
+    Append DataFrame chunks to one Parquet file
+
+    The schema is `schema` or else the first chunk's. Later chunks are cast to
+    it where no value changes (int to float, all-missing to any type); a
+    column that cannot be cast raises a ValueError naming it.
+    """
+
+    def __init__(self, path, compression=DEFAULT_COMPRESSION, schema=None):
+        self.path = path
+        self.compression = compression
+        self.writer = None
+        self.schema = schema
+
+    def write(self, chunk):
+        table = _to_arrow(chunk)
+        if self.schema is None:
+            self.schema = table.schema
+        table = _conform(table, self.schema, self.path)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def write_chunks(chunks, path, compression=DEFAULT_COMPRESSION):
+    """
+    Stream DataFrame chunks to one `.csv` or Parquet file; returns the row count
+
+    Only one chunk is held at a time, so the output can be larger than memory.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    rows = 0
+    if path.endswith('.csv'):
+        with open(path, 'w', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=i == 0)
+                rows += len(chunk)
+        return rows
+
+    sink = ParquetSink(path, compression)
+    try:
+        for chunk in chunks:
+            sink.write(chunk)
+            rows += len(chunk)
+    finally:
+        sink.close()
+    return rows
+
+def write_partitioned(df, root, time_column='timestamp', basename='part', compression=DEFAULT_COMPRESSION):
+    """
+    Write `df` into a date-partitioned Parquet dataset under `root`
+
+    Each date partition gets `<basename>.parquet`; writing the same basename
+    again replaces that file, so re-running a batch never duplicates rows.
+    """
+    dates = pd.to_datetime(df[time_column], utc=True, format='ISO8601').dt.strftime('%Y-%m-%d')
+    paths = []
+    for date, part in df.groupby(dates, sort=True):
+        path = os.path.join(root, f'date={date}', f'{basename}.parquet')
+        paths.append(write_frame(part, path, compression))
+    return paths
+
+def read_dataset(root, columns=None, row_filter=None):
+    """
+    Read a partitioned dataset, optionally only some columns and rows
+
+    `row_filter` is a pyarrow expression, e.g. `ds.field('date') >= '2025-09-01'`;
+    partitions that cannot match are never opened.
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Single-Pass, Mergeable Column Statistics
+========================================
+Accumulates count, mean, standard deviation, min/max and approximate
+quantiles of several numeric columns chunk by chunk, without keeping the data.
+
+- Moments use Welford/Chan updates: each chunk is reduced to (n, mean, M2)
+  and folded in, which is numerically stable and exact to rounding.
+- Quantiles come from a small merging sketch: a sorted list of at most
+  `sketch_size` weighted centroids, re-compressed to equal weights after every
+  update. Rank error is about 1 / sketch_size.
+- Accumulators merge (`merge`) in any order, so worker processes can each
+  summarize their chunks and the parent combines the results.
+
+`UtilityReport` pairs three accumulators (original, DP-protected, and the
+noise between them) so the original-vs-protected comparison comes out of one
+scan of the data.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SKETCH_SIZE = 512
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+class QuantileSketch:
+    """Mergeable quantile summary of one column"""
+
+    def __init__(self, size=DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def _absorb(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        if len(means) > self.size:
+            # Group neighbouring centroids into `size` buckets of equal weight
+            cumulative = np.cumsum(weights)
+            bucket = np.minimum(((cumulative - weights / 2) / cumulative[-1] * self.size).astype(np.int64),
+                                self.size - 1)
+            totals = np.bincount(bucket, weights, self.size)
+            sums = np.bincount(bucket, weights * means, self.size)
+            keep = totals > 0
+            means, weights = sums[keep] / totals[keep], totals[keep]
+        self.means, self.weights = means, weights
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._absorb(values, np.ones(len(values)))
+        return self
+
+    def merge(self, other):
+        self._absorb(other.means, other.weights)
+        return self
+
+    def quantile(self, q):
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan)
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(np.asarray(q) * self.weights.sum(), cumulative, self.means)
+
+class StreamingStats:
+    """Count, mean, std, min, max and quantiles of `columns`, NaN-aware"""
+
+    def __init__(self, columns, sketch_size=DEFAULT_SKETCH_SIZE):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self.sketches = [QuantileSketch(sketch_size) for _ in self.columns]
+
+    def _combine(self, count, mean, m2, lower, upper):
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.0)
+            self.m2 = np.where(total > 0, self.m2 + m2 + delta ** 2 * self.count * count / total, 0.0)
+        self.count = total
+        self.min = np.fmin(self.min, lower)
+        self.max = np.fmax(self.max, upper)
+
+    def update(self, data):
+        """Fold in a DataFrame chunk (or a rows x columns array)"""
+        values = data[self.columns].to_numpy(dtype=np.float64) if isinstance(data, pd.DataFrame) \
+            else np.asarray(data, dtype=np.float64).reshape(-1, len(self.columns))
+        present = ~np.isnan(values)
+        count = present.sum(axis=0).astype(np.float64)
+        filled = np.where(present, values, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, filled.sum(axis=0) / count, 0.0)
+        m2 = (np.where(present, values - mean, 0.0) ** 2).sum(axis=0)
+        lower = np.where(present, values, np.inf).min(axis=0, initial=np.inf)
+        upper = np.where(present, values, -np.inf).max(axis=0, initial=-np.inf)
+        self._combine(count, mean, m2, lower, upper)
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(values[:, j])
+        return self
+
+    def merge(self, other):
+        """Combine with statistics of other chunks (e.g. from another process)"""
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def result(self, quantiles=DEFAULT_QUANTILES):
+        """One row per column: count, mean, std (ddof=1, like pandas), min, max, quantiles"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+        empty = self.count == 0
+        table = pd.DataFrame({
+            'count': self.count.astype(np.int64),
+            'mean': np.where(empty, np.nan, self.mean),
+            'std': std,
+            'min': np.where(empty, np.nan, self.min),
+            'max': np.where(empty, np.nan, self.max),
+        }, index=self.columns)
+        for q in quantiles:
+            table[f'p{round(q * 100):d}'] = [sketch.quantile(q) for sketch in self.sketches]
+        return table
+
+class UtilityReport:
+    """Original vs. DP-protected statistics, and of the noise, from one scan"""
+
+    def __init__(self, columns, sketch_size=DEFAULT_SKETCH_SIZE):
+        self.columns = list(columns)
+        self.original = StreamingStats(self.columns, sketch_size)
+        self.protected = StreamingStats(self.columns, sketch_size)
+        self.noise = StreamingStats(self.columns, sketch_size)
+
+    def update(self, original, protected):
+        """Fold in row-aligned chunks of the original and protected data"""
+        before = original[self.columns].to_numpy(dtype=np.float64)
+        after = protected[self.columns].to_numpy(dtype=np.float64)
+        self.original.update(before)
+        self.protected.update(after)
+        self.noise.update(after - before)
+        return self
+
+    def merge(self, other):
+        self.original.merge(other.original)
+        self.protected.merge(other.protected)
+        self.noise.merge(other.noise)
+        return self
+
+    def table(self):
+        """Side-by-side comparison, one row per column"""
+        original, protected, noise = self.original.result(), self.protected.result(), self.noise.result()
+        return pd.DataFrame({
+            'mean': original['mean'],
+            'dp_mean': protected['mean'],
+            'std': original['std'],
+            'dp_std': protected['std'],
+            'median': original['p50'],
+            'dp_median': protected['p50'],
+            'mean_shift': protected['mean'] - original['mean'],
+            'noise_std': noise['std'],
+        })
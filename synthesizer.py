@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Cached, Chunked CTGAN Synthesizer
+=================================
+Replaces the CTGAN.ipynb routine of retraining `CTGAN().fit(data, every
+column as categorical, epochs=200)` on every run and sampling in one call.
+
+- Column roles are detected: unique text keys (customerID) are identifiers and
+  are not learned, numeric-looking text (TotalCharges) and numbers with many
+  values (tenure, MonthlyCharges) are continuous, the rest is categorical.
+- A trained model is saved under `cache_dir`, keyed by a fingerprint of the
+  training data and the configuration; fitting the same data again loads it.
+- Rows with a missing continuous value (blank TotalCharges) are left out of
+  training rather than filled, so the model never learns invented values and
+  the value ranges come from real data only.
+- `sample(n)` yields synthetic rows in chunks and `write(n, path)` streams them
+  to CSV/Parquet, so 10M rows never sit in memory at once. The random state is
+  seeded once when the model is fitted or loaded, so successive samples differ
+  while the same seed reproduces the same sequence of samples.
+- `threads` caps the CPU threads torch uses for training and sampling.
+
+ctgan and torch are imported only when a model is trained or used, so column
+detection is cheap to import (fidelity.py relies on it).
+
+    synthesizer = CTGANSynthesizer(epochs=200).fit(pd.read_csv('dataset/customer_churn.csv'))
+    synthesizer.write(10_000_000, 'anonymised/synthetic_churn.parquet')
+"""
+
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from storage import write_chunks
+
+DEFAULT_CACHE_DIR = 'synth_models'
+DEFAULT_EPOCHS = 200
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CHUNK_SIZE = 100_000
+# Numeric columns with at most this many distinct integer values are categorical
+MAX_CATEGORIES = 20
+
+def detect_columns(frame, max_categories=MAX_CATEGORIES):
+    """Split columns into {'identifiers', 'categorical', 'continuous'}"""
+    roles = {'identifiers': [], 'categorical': [], 'continuous': []}
+    for col in frame.columns:
+        values = frame[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            whole = values.dropna()
+            discrete = values.nunique() <= max_categories and (whole == np.round(whole)).all()
+            roles['categorical' if discrete else 'continuous'].append(col)
+            continue
+
+        text = values.astype(str).str.strip()
+        if len(values) > 1 and values.nunique() == len(values):
+            roles['identifiers'].append(col)
+            continue
+        # Blank strings are missing values, e.g. TotalCharges of new customers
+        present = text[text != '']
+        if len(present) and pd.to_numeric(present, errors='coerce').notna().all():
+            roles['continuous'].append(col)
+        else:
+            roles['categorical'].append(col)
+    return roles
+
+def prepare(frame, roles):
+    """Training frame: identifiers dropped, continuous columns as floats, rows missing one dropped"""
+    data = frame.drop(columns=roles['identifiers'], errors='ignore')
+    for col in roles['continuous']:
+        values = data[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values.astype(str).str.strip().replace('', np.nan))
+        data[col] = values.astype(np.float64)
+    return data.dropna(subset=roles['continuous']).reset_index(drop=True)
+
+def fingerprint(data, config):
+    """Short hash of the training data and the model configuration"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    digest.update(json.dumps([[col, str(dtype)] for col, dtype in data.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def set_threads(threads):
+    """Limit torch's intra-op CPU threads (None leaves the default)"""
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+
+class CTGANSynthesizer:
+    """CTGAN with column detection, an on-disk model cache and chunked sampling"""
+
+    def __init__(self, epochs=DEFAULT_EPOCHS, batch_size=DEFAULT_BATCH_SIZE, max_categories=MAX_CATEGORIES,
+                 cache_dir=DEFAULT_CACHE_DIR, threads=None, seed=0, verbose=False):
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.max_categories = max_categories
+        self.cache_dir = cache_dir
+        self.threads = threads
+        self.seed = seed
+        self.verbose = verbose
+        self.model = None
+        self.state = None
+        self.cached = False
+        self.sampled = 0
+
+    def config(self, roles):
+        import ctgan
+        return {'epochs': self.epochs, 'batch_size': self.batch_size, 'seed': self.seed,
+                'roles': roles, 'ctgan': ctgan.__version__}
+
+    def model_file(self, key):
+        return os.path.join(self.cache_dir, f'ctgan-{key}.joblib')
+
+    def fit(self, frame):
+        """Train on `frame`, or load the cached model trained on the same data and config"""
+        roles = detect_columns(frame, self.max_categories)
+        data = prepare(frame, roles)
+        key = fingerprint(data, self.config(roles))
+        path = self.model_file(key)
+
+        set_threads(self.threads)
+        self.sampled = 0
+        if os.path.exists(path):
+            self.model, self.state = joblib.load(path)
+            self.model.set_random_state(self.seed)
+            self.cached = True
+            if self.verbose:
+                print(f"♻️ Loaded cached CTGAN model {path}")
+            return self
+
+        from ctgan import CTGAN
+
+        model = CTGAN(epochs=self.epochs, batch_size=self.batch_size, verbose=self.verbose)
+        model.set_random_state(self.seed)
+        model.fit(data, roles['categorical'])
+
+        continuous = data[roles['continuous']]
+        state = {
+            'key': key,
+            'columns': list(frame.columns),
+            'roles': roles,
+            'bounds': {col: (float(continuous[col].min()), float(continuous[col].max())) for col in continuous},
+            'integers': [col for col in roles['continuous'] if pd.api.types.is_integer_dtype(frame[col])],
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_file = path + '.tmp'
+        joblib.dump((model, state), tmp_file)
+        os.replace(tmp_file, path)
+        # Sampling starts from the seed whether the model was trained or loaded
+        model.set_random_state(self.seed)
+        self.model, self.state, self.cached = model, state, False
+        return self
+
+    def _finish(self, chunk, start):
+        """Restore identifiers, value ranges and integer columns of one sampled chunk"""
+        state = self.state
+        for col, (lower, upper) in state['bounds'].items():
+            chunk[col] = chunk[col].clip(lower, upper)
+        for col in state['integers']:
+            chunk[col] = chunk[col].round().astype(np.int64)
+        for col in state['roles']['identifiers']:
+            chunk[col] = [f'SYN-{i:08d}' for i in range(start, start + len(chunk))]
+        return chunk[state['columns']]
+
+    def sample(self, n, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield `n` synthetic rows as DataFrames of at most `chunk_size` rows
+
+        Each call continues the random stream (and the SYN- identifiers) where
+        the previous one stopped.
+        """
+        if self.model is None:
+            raise RuntimeError("fit() the synthesizer before sampling")
+        set_threads(self.threads)
+        for offset in range(0, n, chunk_size):
+            start = self.sampled
+            chunk = self.model.sample(min(chunk_size, n - offset))
+            self.sampled += len(chunk)
+            yield self._finish(chunk.reset_index(drop=True), start)
+
+    def write(self, n, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Stream `n` synthetic rows to a .csv or Parquet file; returns the row count"""
+        return write_chunks(self.sample(n, chunk_size), path)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Synthetic Test Data Generator
+=============================
+Builds realistic stand-ins for every dataset the pipelines touch, at any scale:
+
+- `fable` rows: survey answers in the Survey.jsx `allData` format, encrypted
+  exactly as the app does (see decryption.encrypt_batch)
+- `ocr` rows: photographed-text snippets, some containing emails, phone and
+  card numbers, encrypted the same way
+- churn rows shaped like dataset/customer_churn.csv
+
+Rows are generated in chunks with a seeded NumPy generator, so the same seed
+always gives the same data. Used by benchmark.py together with fake_supabase.
+"""
+
+import numpy as np
+import pandas as pd
+
+from decryption import APP_IV, APP_KEY, SURVEY_CHOICES, block_encrypter, encrypt_batch
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+FIRST_NAMES = np.array(['Aarav', 'Maya', 'Liam', 'Olivia', 'Noah', 'Emma', 'Rayan', 'Sara',
+                        'Ethan', 'Zoe', 'Arjun', 'Chloe', 'Lucas', 'Isha', 'Mateo', 'Nina'])
+CITIES = np.array(['Mumbai', 'Pune', 'London', 'Paris', 'Austin', 'Berlin', 'Tokyo',
+                   'Toronto', 'Lagos', 'Sydney', 'Dubai', 'Madrid'])
+DEPARTMENTS = np.array(['Books', 'Electronics', 'Garden', 'Toys', 'Health', 'Music',
+                        'Sports', 'Grocery', 'Beauty', 'Automotive'])
+OCR_SNIPPETS = np.array([
+    'Invoice total due by end of month', 'Meeting notes for the quarterly review',
+    'Receipt thank you for shopping with us', 'Table of contents chapter one',
+    'Please keep this document for your records', 'Warranty valid for two years',
+])
+
+def parse_scale(text):
+    """'10k' -> 10000, '1m' -> 1000000"""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+def _timestamps(n, start, rng, mean_gap_seconds):
+    """Increasing Supabase-style ISO timestamps with exponential gaps"""
+    gaps = rng.exponential(mean_gap_seconds * 1e6, size=n).astype(np.int64) + 1
+    micros = np.datetime64(pd.Timestamp(start).tz_localize(None), 'us') + np.cumsum(gaps).astype('timedelta64[us]')
+    return np.char.add(np.datetime_as_string(micros, unit='us'), '+00:00').astype(object)
+
+def _encrypted_frame(texts, start_id, timestamps, column, encrypt_blocks):
+    return pd.DataFrame({
+        'id': np.arange(start_id, start_id + len(texts), dtype=np.int64),
+        'created_at': timestamps,
+        column: encrypt_batch(texts, encrypt_blocks, APP_IV),
+    })
+
+def survey_texts(n, rng):
+    """Plaintext survey answers in the app's `allData` format"""
+    names = rng.choice(FIRST_NAMES, n)
+    cities = rng.choice(CITIES, n)
+    departments = rng.choice(DEPARTMENTS, n)
+    picks = {col: rng.choice(np.array(choices), n) for col, choices in SURVEY_CHOICES.items()}
+    return [
+        f"name: {name}, location: {city}, occupation: {dept}, amount: {amount}, "
+        f"purchases: {purchases}, likely: {likely}"
+        for name, city, dept, amount, purchases, likely
+        in zip(names, cities, departments, picks['amount'], picks['purchases'], picks['likely'])
+    ]
+
+def ocr_texts(n, rng):
+    """OCR-like text; roughly a third contains an email, phone or card number"""
+    snippets = rng.choice(OCR_SNIPPETS, n)
+    kinds = rng.integers(0, 6, n)
+    names = rng.choice(FIRST_NAMES, n)
+    numbers = rng.integers(0, 10**10, n)
+    texts = []
+    for snippet, kind, name, number in zip(snippets, kinds, names, numbers):
+        if kind == 0:
+            snippet += f" contact {name.lower()}.{number % 1000}@example.com"
+        elif kind == 1:
+            snippet += f" call +1 {number // 10**7 % 1000:03d}-{number // 10**4 % 1000:03d}-{number % 10**4:04d}"
+        elif kind == 2:
+            snippet += f" card 4111 1111 {number // 10**4 % 10**4:04d} {number % 10**4:04d}"
+        texts.append(snippet)
+    return texts
+
+def iter_survey_frames(n, seed=0, start='2025-09-01', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield `fable`-shaped DataFrames (id, created_at, hash_data) in chunks"""
+    rng = np.random.default_rng(seed)
+    encrypt_blocks = block_encrypter(APP_KEY)
+    timestamps = _timestamps(n, start, rng, mean_gap_seconds=30)
+    for begin in range(0, n, chunk_size):
+        size = min(chunk_size, n - begin)
+        yield _encrypted_frame(survey_texts(size, rng), begin + 1, timestamps[begin:begin + size],
+                               'hash_data', encrypt_blocks)
+
+def iter_ocr_frames(n, seed=1, start='2025-09-01', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield `ocr`-shaped DataFrames (id, created_at, recog_text) in chunks"""
+    rng = np.random.default_rng(seed)
+    encrypt_blocks = block_encrypter(APP_KEY)
+    timestamps = _timestamps(n, start, rng, mean_gap_seconds=120)
+    for begin in range(0, n, chunk_size):
+        size = min(chunk_size, n - begin)
+        yield _encrypted_frame(ocr_texts(size, rng), begin + 1, timestamps[begin:begin + size],
+                               'recog_text', encrypt_blocks)
+
+def generate_survey_frame(n, seed=0, start='2025-09-01'):
+    return pd.concat(iter_survey_frames(n, seed, start), ignore_index=True)
+
+def generate_ocr_frame(n, seed=1, start='2025-09-01'):
+    return pd.concat(iter_ocr_frames(n, seed, start), ignore_index=True)
+
+def _churn_frame(n, rng):
+    def pick(values, p):
+        return rng.choice(np.array(values, dtype=object), n, p=p)
+
+    internet = pick(['Fiber optic', 'DSL', 'No'], [0.44, 0.344, 0.216])
+    phone = pick(['Yes', 'No'], [0.903, 0.097])
+    contract = pick(['Month-to-month', 'Two year', 'One year'], [0.55, 0.241, 0.209])
+    tenure = rng.integers(0, 73, n)
+    monthly = np.round(rng.uniform(18.25, 118.75, n), 2)
+    total = np.round(monthly * np.maximum(tenure, 1) * rng.uniform(0.9, 1.1, n), 2)
+
+    df = pd.DataFrame({
+        'customerID': [f"{a:04d}-{b}" for a, b in zip(rng.integers(0, 10000, n),
+                                                      rng.choice(np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ')), (n, 5)).view('<U5').ravel())],
+        'gender': pick(['Male', 'Female'], [0.505, 0.495]),
+        'SeniorCitizen': rng.choice([0, 1], n, p=[0.838, 0.162]),
+        'Partner': pick(['No', 'Yes'], [0.517, 0.483]),
+        'Dependents': pick(['No', 'Yes'], [0.7, 0.3]),
+        'tenure': tenure,
+        'PhoneService': phone,
+        'MultipleLines': np.where(phone == 'No', 'No phone service', pick(['No', 'Yes'], [0.53, 0.47])),
+    })
+    df['InternetService'] = internet
+    for col in ['OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies']:
+        df[col] = np.where(internet == 'No', 'No internet service', pick(['No', 'Yes'], [0.55, 0.45]))
+    df['Contract'] = contract
+    df['PaperlessBilling'] = pick(['Yes', 'No'], [0.592, 0.408])
+    df['PaymentMethod'] = pick(['Electronic check', 'Mailed check', 'Bank transfer (automatic)',
+                                'Credit card (automatic)'], [0.336, 0.229, 0.219, 0.216])
+    df['MonthlyCharges'] = monthly
+    # Brand-new customers have a blank TotalCharges, as in the real export
+    df['TotalCharges'] = np.where(tenure == 0, ' ', total.astype(str))
+    churn_rate = np.select([contract == 'Month-to-month', contract == 'One year'], [0.43, 0.11], 0.03)
+    df['Churn'] = np.where(rng.random(n) < churn_rate, 'Yes', 'No')
+    return df
+
+def generate_churn_frame(n, seed=2):
+    """Rows shaped like dataset/customer_churn.csv, with consistent service columns"""
+    return _churn_frame(n, np.random.default_rng(seed))
+
+def iter_churn_frames(n, seed=2, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield churn-shaped DataFrames in chunks from one seeded generator"""
+    rng = np.random.default_rng(seed)
+    for begin in range(0, n, chunk_size):
+        yield _churn_frame(min(chunk_size, n - begin), rng)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Chunked Table Reader - Stream Mobile App Tables Out of Supabase
+===============================================================
+Reads the `fable` (survey) and `ocr` tables page by page instead of
+`select('*').execute()` on the whole table.
+
+Pages are keyed on (created_at, id) rather than OFFSET, so every request is a
+cheap range scan and no page is ever skipped or repeated while new rows arrive.
+Reading stops only at an empty page, never at a short one: a `batch_size`
+above PostgREST's max-rows limit just gets capped pages, and the next page
+continues after the last row returned. Only the columns a caller asks for are
+transferred, and memory depends on the batch size, not on the size of the
+table.
+"""
+
+from aggregates import LENGTH_COLUMNS, normalize_summary, summarize_pages
+
+# Supabase caps a single PostgREST response at 1000 rows by default
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns the pipelines actually use from each table
+TABLE_COLUMNS = {
+    'fable': ['id', 'created_at', 'hash_data'],
+    'ocr': ['id', 'created_at', 'recog_text'],
+}
+
+def _quote(value):
+    """Quote a value for use inside a PostgREST `or` filter"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _keyset_filter(created_at, row_id):
+    """Filter selecting rows strictly after the (created_at, id) key"""
+    ts = _quote(created_at)
+    return f"created_at.gt.{ts},and(created_at.eq.{ts},id.gt.{row_id})"
+
+def iter_table_pages(supabase, table, columns=None, batch_size=DEFAULT_BATCH_SIZE, after=None):
+    """
+    Yield pages (lists of row dicts) of `table` ordered by (created_at, id)
+
+    `after` is an optional (created_at, id) key; only rows after it are read.
+    """
+    columns = list(columns or TABLE_COLUMNS.get(table, ['*']))
+    if columns != ['*']:
+        # The paging key has to come back with every row
+        columns += [c for c in ('created_at', 'id') if c not in columns]
+
+    last_key = after
+    while True:
+        query = supabase.table(table).select(','.join(columns))
+        if last_key is not None:
+            query = query.or_(_keyset_filter(*last_key))
+        rows = query.order('created_at').order('id').limit(batch_size).execute().data
+
+        # A short page may only be capped by max-rows; the empty page ends the table
+        if not rows:
+            return
+        yield rows
+        last_key = (rows[-1]['created_at'], rows[-1]['id'])
+
+def iter_table_batches(supabase, table, columns=None, batch_size=DEFAULT_BATCH_SIZE, after=None):
+    """Yield DataFrame batches of `table` ordered by (created_at, id)"""
+    import pandas as pd
+
+    for rows in iter_table_pages(supabase, table, columns, batch_size, after):
+        yield pd.DataFrame.from_records(rows)
+
+def read_table(supabase, table, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Read a whole table through the paged reader into one DataFrame"""
+    import pandas as pd
+
+    batches = list(iter_table_batches(supabase, table, columns, batch_size))
+    if not batches:
+        return pd.DataFrame(columns=columns or TABLE_COLUMNS.get(table, []))
+    return pd.concat(batches, ignore_index=True)
+
+class SupabaseSource:
+    """
+    Data source reading straight from a Supabase client
+
+    Scripts read tables through a source (`iter_pages`, `iter_batches`,
+    `read`, `read_many`, `summarize`), so the same code runs against Supabase or a replica.LocalReplica.
+    """
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def iter_pages(self, table, columns=None, batch_size=DEFAULT_BATCH_SIZE, after=None):
+        return iter_table_pages(self.supabase, table, columns, batch_size, after)
+
+    def iter_batches(self, table, columns=None, batch_size=DEFAULT_BATCH_SIZE, after=None):
+        return iter_table_batches(self.supabase, table, columns, batch_size, after)
+
+    def read(self, table, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        return read_table(self.supabase, table, columns, batch_size)
+
+    def read_many(self, tables, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Read several tables into {table: DataFrame}, fetching them concurrently
+        over one HTTP session (async_ingest.py) when the client is a real
+        Supabase client
+        """
+        url = getattr(self.supabase, 'supabase_url', None)
+        if url is None:
+            return {table: self.read(table, batch_size=batch_size) for table in tables}
+        from async_ingest import fetch_tables
+        return fetch_tables(tables, batch_size=batch_size, url=str(url), key=self.supabase.supabase_key)
+
+    def summarize(self, table):
+        """
+        Counts, hour/day histograms and length statistics via the
+        `table_summary` RPC (see aggregates.py), without fetching rows
+        """
+        length_column = LENGTH_COLUMNS.get(table)
+        try:
+            summary = self.supabase.rpc('table_summary', {'table_name': table,
+                                                          'length_column': length_column}).execute().data
+        except Exception as e:
+            # Function not installed: compute the same summary from streamed pages
+            print(f"⚠️ table_summary RPC unavailable ({e}); summarizing '{table}' client-side")
+            columns = ['created_at'] + ([length_column] if length_column else [])
+            return summarize_pages(self.iter_pages(table, columns), length_column)
+        return normalize_summary(summary)
+
+def as_source(source):
+    """Wrap a Supabase client as a data source; sources pass through unchanged"""
+    if hasattr(source, 'iter_pages'):
+        return source
+    return SupabaseSource(source)